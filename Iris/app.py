@@ -5,14 +5,29 @@ from flask import Flask, request, render_template_string
 from core.config import Config
 from datetime import datetime, UTC
 import time
-from models.database import db, init_db, User, LogSocket
-from views.api_views import api_bp
+from models.database import db, init_db, User, LogSocket, ApiScript
+from views.api_views import api_bp, FABRIC_DIR
 from views.admin_views import admin_bp
 from views.views import route_bp
 from core.protect import Fail2Ban
 from core.error import error_404
 from core.logging import CustomWerkzeugLogHandler
 from core.fabric import refresh_db # Import refresh_db
+from core.executor import start_process_pool, configure_process_pool, configure_thread_pool, configure_batch_pool
+from core.cache import result_cache
+from core.jobs import jobs
+from core.watcher import fabric_watcher
+from core.warmup import warmup
+from core.serializer import serializer
+from core.compression import compression, DEFAULT_LEVELS
+from core.singleflight import single_flight
+from core.accounting import accounting
+from core.token_cache import token_cache
+from core.auth import clear_identity
+from core.session_store import sessions
+from core.jwt_cache import jwt_cache
+from core.log_writer import log_writer
+from core.retention import log_retention, RetentionPolicy, LOG_MODELS
 import logging
 import zpp_store
     
@@ -57,6 +72,10 @@ class Backend():
         # Register request logging hooks
         self.app.before_request(self._before_request_log)
         self.app.after_request(self._after_request_log)
+        # Compression des réponses (API et administration) selon Accept-Encoding
+        self.app.after_request(compression.after_request)
+        # Identité de la requête (cookie décodé, utilisateur chargé) mémorisée dans flask.g
+        self.app.teardown_request(clear_identity)
 
     def _before_request_log(self):
         request.start_time = time.time()
@@ -73,7 +92,7 @@ class Backend():
     def _after_request_log(self, response):
         try:
             response_time_ms = int((time.time() - request.start_time) * 1000)
-            log_entry = LogSocket(
+            row = dict(
                 timestamp=datetime.now(UTC),
                 ip_address=request.remote_addr,
                 method=request.method,
@@ -82,8 +101,9 @@ class Backend():
                 response_time_ms=response_time_ms,
                 request_body=getattr(request, 'logged_request_body', None) # Safely retrieve
             )
-            db.session.add(log_entry)
-            db.session.commit()
+            if not log_writer.write(LogSocket, row):
+                db.session.add(LogSocket(**row))
+                db.session.commit()
         except Exception as e:
             # Log the error to console or a file, but don't break the request
             print(f"Error logging request: {e}")
@@ -100,6 +120,36 @@ class Backend():
         self.app_mode = self.app_settings.get("app.mode", "DEV")
         self.debug = self.app_settings.get("app.debug", False)
 
+        ## CONFIGURATION LOGS ##
+        log_writer.configure(
+            self.app,
+            self.app_settings.get("logs.async", True),
+            self.app_settings.get("logs.queue_size", 10000),
+            self.app_settings.get("logs.batch_size", 500),
+            self.app_settings.get("logs.flush_interval", 1.0),
+            self.app_settings.get("logs.overflow", "block"),
+            self.app_settings.get("logs.sample_rate", 0.1)
+        )
+        ## CONFIGURATION LOGS ##
+
+        ## CONFIGURATION RETENTION ##
+        archive_dir = self.app_settings.get("retention.archive_dir", None)
+        log_retention.configure(
+            self.app,
+            self.app_settings.get("retention.enable", False),
+            {model.__tablename__: RetentionPolicy(
+                self.app_settings.get(f"retention.tables.{model.__tablename__}.max_age_days", None),
+                self.app_settings.get(f"retention.tables.{model.__tablename__}.max_rows", None)
+            ) for model in LOG_MODELS},
+            self.app_settings.get("retention.interval", 3600),
+            self.app_settings.get("retention.batch_size", 1000),
+            self.app_settings.get("retention.pause", 0.05),
+            self.app_settings.get("retention.vacuum_pages", 1000),
+            os.path.join(self.app.instance_path, archive_dir) if archive_dir else None,
+            self.app_settings.get("retention.vacuum_convert", False)
+        )
+        ## CONFIGURATION RETENTION ##
+
         ## CONFIGURATION FAIL2BAN ##
         self.enable_auto_protect = self.app_settings.get("auto_protect.enable", False)
 
@@ -112,6 +162,84 @@ class Backend():
 
             self.protect = Fail2Ban(self.app, blacklist, whitelist, max_fail, fail_interval, ban_time)
         ## CONFIGURATION FAIL2BAN ##
+
+        ## CONFIGURATION FABRIC ##
+        if self.app_settings.get("fabric.watch", True):
+            fabric_watcher.start(self.app, FABRIC_DIR, self.app_settings.get("fabric.backend", "auto"), self.app_settings.get("fabric.interval", 2))
+        ## CONFIGURATION FABRIC ##
+
+        ## CONFIGURATION EXECUTION ##
+        configure_thread_pool(self.app_settings.get("execution.thread_workers", 32))
+        self.process_workers = self.app_settings.get("execution.process_workers", 0)
+        configure_process_pool(self.process_workers, FABRIC_DIR)
+
+        if self.process_workers:
+            # Scripts en mode process (ligne ApiScript ou décorateur): préchargés dans chaque worker du pool
+            start_process_pool()
+        ## CONFIGURATION EXECUTION ##
+
+        ## CONFIGURATION BATCH ##
+        configure_batch_pool(self.app_settings.get("batch.workers", 8))
+        ## CONFIGURATION BATCH ##
+
+        ## CONFIGURATION JOBS ##
+        jobs.configure(self.app, self.app_settings.get("jobs.workers", 4), self.app_settings.get("jobs.ttl", 3600))
+        ## CONFIGURATION JOBS ##
+
+        ## CONFIGURATION JSON ##
+        serializer.configure(self.app_settings.get("json.backend", "auto"), self.app_settings.get("json.sort_keys", True))
+        ## CONFIGURATION JSON ##
+
+        ## CONFIGURATION ACCOUNTING ##
+        accounting.configure(self.app_settings.get("accounting.enable", True), self.app_settings.get("accounting.memory_sample_rate", 0.01), self.app_settings.get("accounting.top_n", 10))
+        ## CONFIGURATION ACCOUNTING ##
+
+        ## CONFIGURATION COALESCE ##
+        single_flight.timeout = self.app_settings.get("coalesce.timeout", 30)
+        ## CONFIGURATION COALESCE ##
+
+        ## CONFIGURATION COMPRESSION ##
+        compression.configure(
+            self.app_settings.get("compression.enable", True),
+            self.app_settings.get("compression.min_size", 1024),
+            self.app_settings.get("compression.algorithms", ['br', 'zstd', 'gzip']),
+            {name: self.app_settings.get(f"compression.levels.{name}", level) for name, level in DEFAULT_LEVELS.items()}
+        )
+        ## CONFIGURATION COMPRESSION ##
+
+        ## CONFIGURATION CACHE ##
+        result_cache.max_entry_bytes = self.app_settings.get("cache.max_entry_bytes", 1024 * 1024)
+        ## CONFIGURATION CACHE ##
+
+        ## CONFIGURATION TOKEN CACHE ##
+        token_cache.configure(
+            self.app_settings.get("token_cache.ttl", 60),
+            self.app_settings.get("token_cache.max_entries", 10000),
+            self.app_settings.get("token_cache.negative_ttl", 5),
+            self.app_settings.get("token_cache.max_negative", 1000)
+        )
+        ## CONFIGURATION TOKEN CACHE ##
+
+        ## CONFIGURATION SESSIONS ##
+        sessions.configure(
+            self.app_settings.get("sessions.backend", "memory"),
+            os.path.join(self.app.instance_path, self.app_settings.get("sessions.filename", "sessions.db")),
+            self.app_settings.get("sessions.ttl", 3600 * 60),
+            self.app_settings.get("sessions.max_entries", 10000),
+            self.app_settings.get("sessions.sweep_interval", 300)
+        )
+        jwt_cache.max_entries = self.app_settings.get("sessions.jwt_cache_entries", 1024)
+        ## CONFIGURATION SESSIONS ##
+
+        ## CONFIGURATION WARMUP ##
+        # Après la synchronisation du dossier fabric et la configuration de l'exécution: les scripts préchargés sont ceux de la base à jour
+        if self.app_settings.get("warmup.enable", True):
+            if not fabric_watcher.running:
+                refresh_db(FABRIC_DIR)
+            warmup.start(self.app, FABRIC_DIR, self.app_settings.get("warmup.workers", 8), self.app_settings.get("warmup.wait", True))
+        else:
+            warmup.ready = True
+        ## CONFIGURATION WARMUP ##
         
         #self.register_error_handlers()
         self.app.errorhandler(404)(self.page_not_found)
@@ -160,8 +288,6 @@ class Backend():
 
 
 if __name__ == '__main__':
-    # Initialiser les variables globales attendues par votre module d'authentification
-    __main__.auth_cache = {}
     __main__.backend = Backend()
 
     with  __main__.backend.app.app_context():
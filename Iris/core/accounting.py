@@ -0,0 +1,100 @@
+import time
+import random
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+class ResourceUsage:
+    """
+    Ressources consommées par un appel de point d'entrée: durée, temps CPU du thread, pic mémoire (échantillonné) et taille du résultat.
+    Le pic mémoire est approché: tracemalloc compte aussi les allocations des autres threads pendant la mesure.
+    """
+    __slots__ = ('wall_ms', 'cpu_ms', 'memory_peak', 'result_size', 'sample_memory')
+
+    def __init__(self, sample_memory=False):
+        self.wall_ms = None
+        self.cpu_ms = None
+        self.memory_peak = None
+        self.result_size = None
+        self.sample_memory = sample_memory
+
+    def to_state(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def update(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+# Un seul appel mesuré à la fois par tracemalloc. Le pic reste global au processus: les allocations des requêtes
+# exécutées en même temps dans d'autres threads y sont incluses, seul un worker 'process' donne un pic propre au script
+_memory_lock = threading.Lock()
+
+
+@contextmanager
+def _measure(usage, cpu, accumulate):
+    start_wall = time.perf_counter()
+    start_cpu = time.thread_time()
+
+    tracing = usage.sample_memory and _memory_lock.acquire(blocking=False)
+    if tracing:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+    try:
+        yield usage
+    finally:
+        wall_ms = (time.perf_counter() - start_wall) * 1000
+        # Pour une coroutine, le thread attend la boucle asyncio: son temps CPU ne serait pas celui du script
+        cpu_ms = (time.thread_time() - start_cpu) * 1000 if cpu else None
+        if accumulate:
+            # Flux: chaque reprise du générateur s'ajoute aux mesures précédentes de l'appel
+            wall_ms += usage.wall_ms or 0
+            cpu_ms = cpu_ms + (usage.cpu_ms or 0) if cpu else usage.cpu_ms
+
+        usage.wall_ms = round(wall_ms, 3)
+        usage.cpu_ms = round(cpu_ms, 3) if cpu_ms is not None else None
+
+        if tracing:
+            peak = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            usage.memory_peak = max(peak, usage.memory_peak or 0) if accumulate else peak
+            if started:
+                tracemalloc.stop()
+            _memory_lock.release()
+
+
+def measure(usage, cpu=True, accumulate=False):
+    """
+    Mesure le bloc dans le thread qui exécute le script. Sans ResourceUsage, ne mesure rien.
+    Avec accumulate, les mesures s'ajoutent à celles déjà présentes (reprises successives d'un flux).
+    """
+    if usage is None:
+        return nullcontext()
+
+    return _measure(usage, cpu, accumulate)
+
+
+class ResourceAccounting:
+    def __init__(self):
+        self.enabled = True
+        self.memory_sample_rate = 0.01
+        self.top_n = 10
+
+    def configure(self, enable=True, memory_sample_rate=0.01, top_n=10):
+        self.enabled = enable
+        self.memory_sample_rate = memory_sample_rate
+        self.top_n = top_n
+
+    def new_usage(self):
+        if not self.enabled:
+            return None
+
+        # tracemalloc ralentit toutes les allocations du processus: seule une fraction des appels est mesurée
+        return ResourceUsage(sample_memory=self.memory_sample_rate > 0 and random.random() < self.memory_sample_rate)
+
+
+accounting = ResourceAccounting()
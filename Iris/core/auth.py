@@ -1,8 +1,10 @@
 import __main__
 import jwt
 from functools import wraps
-from flask import request, redirect, url_for, current_app
-from models.database import User
+from flask import request, redirect, url_for, current_app, g
+from models.database import db, User
+from core.session_store import sessions
+from core.jwt_cache import jwt_cache
 
 import hashlib
 import secrets
@@ -16,16 +18,13 @@ def get_token():
 
 
 def generate_token(user_id, role):
-    if not hasattr(__main__, 'auth_cache'):
-        __main__.auth_cache = {}
-
     sub = str(uuid.uuid4())
 
     iat = int(time.time())
     iss = "Iris"
 
     not_before_time = datetime.datetime.utcnow()
-    expiration_time = not_before_time + datetime.timedelta(minutes=3600)
+    expiration_time = not_before_time + datetime.timedelta(seconds=sessions.ttl)
 
     token = get_token()
 
@@ -38,107 +37,149 @@ def generate_token(user_id, role):
         "token": token,
     }
 
-    __main__.auth_cache[token] = {"user_id": user_id, "role": role}
-
+    sessions.create(token, user_id, role)
 
     return jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm='HS256')
 
 
-def verify_token():
-    if not hasattr(__main__, 'auth_cache'):
-        __main__.auth_cache = {}
-
+def _verify_session():
+    # (payload du cookie, session) si le cookie est valide et la session active, sinon (None, None)
     token = request.cookies.get('iris_key')
     if not token:
-        return None
+        return None, None
 
-    try:
-        payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    payload = jwt_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+        except jwt.ExpiredSignatureError:
+            return None, None
+        except jwt.InvalidTokenError:
+            return None, None
 
-        if payload['token'] not in __main__.auth_cache:
-            return None
+        jwt_cache.put(token, payload)
 
-        return payload
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.InvalidTokenError:
-        return None
+    session = sessions.get(payload['token'])
+    if session is None:
+        # Session révoquée ou expirée (éventuellement par un autre processus)
+        jwt_cache.evict(token)
+        return None, None
 
+    return payload, session
 
-def get_user_id():
+
+def verify_token():
+    return _verify_session()[0]
+
+
+def revoke_token():
+    # Déconnexion: la session du cookie est supprimée du stockage, le cookie n'est plus accepté
     payload = verify_token()
     if payload:
-        return __main__.auth_cache[payload['token']]['user_id']
+        sessions.revoke(payload['token'])
+        jwt_cache.evict(request.cookies.get('iris_key'))
 
-    else:
-        return None
 
+class Identity:
+    """
+    Identité de la requête: jeton de session vérifié et utilisateur chargé une seule fois, avec ses permissions.
+    """
+    __slots__ = ('payload', 'user_id', 'session_role', 'user', 'permission_ids')
 
-# A OPTIMISER #
-def get_username(user_id=None):
-    if not user_id:
-        user_id = get_user_id()
-    
-    if user_id:
-        user = User.query.filter_by(id=user_id).first()
-        if user:
-            return user.username
+    def __init__(self, payload, session, user):
+        self.payload = payload
+        self.user_id = session['user_id']
+        self.session_role = session['role'] # Rôle au moment de la connexion, utilisé par auth_required
+        self.user = user
+        self.permission_ids = frozenset(script.id for script in user.api_permissions) if user else frozenset()
 
-    return None
 
+def _load_user(user_id):
+    # Utilisateurs chargés pendant la requête (api_permissions est chargé avec l'utilisateur)
+    users = g.setdefault('iris_users', {})
+    if user_id not in users:
+        users[user_id] = db.session.get(User, user_id)
 
-def get_role(user_id=None):
-    if not user_id:
-        user_id = get_user_id()
-    
-    if user_id:
-        user = User.query.filter_by(id=user_id).first()
-        if user:
-            return user.role
+    return users[user_id]
 
-    return None
 
+def resolve_identity():
+    """
+    Décode le cookie et charge l'utilisateur au premier appel, puis renvoie l'identité mémorisée dans flask.g.
+    None si la requête n'est pas authentifiée.
+    """
+    if 'iris_auth' not in g:
+        identity = None
+        payload, session = _verify_session()
+        if payload:
+            identity = Identity(payload, session, _load_user(session['user_id']))
 
-def get_api_all_access(user_id=None):
+        g.iris_auth = identity
+
+    return g.iris_auth
+
+
+def clear_identity(exc=None):
+    # flask.g est partagé par les requêtes lorsqu'un contexte d'application englobant est déjà ouvert (tests, tâches)
+    for key in ('iris_auth', 'iris_users', 'iris_identity'):
+        g.pop(key, None)
+
+
+def _get_user(user_id=None):
     if not user_id:
-        user_id = get_user_id()
-    
-    if user_id:
-        user = User.query.filter_by(id=user_id).first()
-        if user:
-            return user.api_all_access
+        identity = resolve_identity()
+        return identity.user if identity else None
+
+    return _load_user(user_id)
+
+
+def get_user_id():
+    identity = resolve_identity()
+    return identity.user_id if identity else None
 
-    return None
+
+def get_username(user_id=None):
+    user = _get_user(user_id)
+    return user.username if user else None
+
+
+def get_role(user_id=None):
+    user = _get_user(user_id)
+    return user.role if user else None
+
+
+def get_api_all_access(user_id=None):
+    user = _get_user(user_id)
+    return user.api_all_access if user else None
 
 
 def get_api_permissions(user_id=None):
+    user = _get_user(user_id)
+    return user.api_permissions if user else None
+
+
+def get_api_permission_ids(user_id=None):
     if not user_id:
-        user_id = get_user_id()
-    
-    if user_id:
-        user = User.query.filter_by(id=user_id).first()
-        if user:
-            return user.api_permissions
+        identity = resolve_identity()
+        return identity.permission_ids if identity else frozenset()
 
-    return None
-# A OPTIMISER #
+    user = _load_user(user_id)
+    return frozenset(script.id for script in user.api_permissions) if user else frozenset()
 
-def auth_required(required_roles=None):
-    if not hasattr(__main__, 'auth_cache'):
-        __main__.auth_cache = {}
 
+def auth_required(required_roles=None):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             if not __main__.backend.auth_required:
                 return f(*args, **kwargs)
 
-            payload = verify_token()
-            if not payload or payload['token'] not in __main__.auth_cache:
+            identity = resolve_identity()
+            if not identity:
                 return redirect(url_for('admin.login'))
 
             if required_roles:
-                if __main__.auth_cache[payload['token']]['role'] not in required_roles:
+                if identity.session_role not in required_roles:
                     return redirect(url_for('admin.login'))
 
             return f(*args, **kwargs)
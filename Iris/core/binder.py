@@ -0,0 +1,181 @@
+import dataclasses
+import datetime
+import inspect
+import json
+import types
+import typing
+
+
+_TRUE_VALUES = {'1', 'true', 'yes', 'on', 'oui'}
+_FALSE_VALUES = {'0', 'false', 'no', 'off', 'non'}
+
+
+class BindingError(Exception):
+    """
+    Erreur de liaison des arguments d'une requête au point d'entrée d'un script.
+    """
+    def __init__(self, errors):
+        self.errors = errors
+
+        missing = [error['argument'] for error in errors if error['error'] == 'missing']
+        if len(missing) == len(errors):
+            self.message = f"Arguments manquants: {', '.join(missing)}"
+        else:
+            self.message = f"Arguments invalides: {', '.join(error['argument'] for error in errors)}"
+
+        super().__init__(self.message)
+
+
+def _to_bool(value):
+    lowered = value.strip().lower()
+    if lowered in _TRUE_VALUES:
+        return True
+    if lowered in _FALSE_VALUES:
+        return False
+    raise ValueError(f"booléen invalide: {value}")
+
+
+def _load_json(value, expected):
+    data = json.loads(value)
+    if not isinstance(data, expected):
+        raise ValueError(f"{expected.__name__} attendu")
+    return data
+
+
+def _type_name(annotation):
+    if annotation is inspect.Parameter.empty:
+        return "Any"
+    if isinstance(annotation, type) and not typing.get_args(annotation):
+        return annotation.__name__
+    return str(annotation).replace('typing.', '')
+
+
+class _Parameter:
+    def __init__(self, name, annotation, required):
+        self.name = name
+        self.required = required
+        self.type_name = _type_name(annotation)
+        self.multiple = False
+        self.convert = self._compile(annotation)
+
+    def _compile(self, annotation):
+        if annotation is inspect.Parameter.empty or annotation is typing.Any or annotation is str:
+            return None
+
+        origin = typing.get_origin(annotation)
+        args = typing.get_args(annotation)
+
+        # Optional[X] / X | None: on convertit vers X
+        if origin is typing.Union or origin is types.UnionType:
+            not_none = [arg for arg in args if arg is not type(None)]
+            if len(not_none) == 1:
+                return self._compile(not_none[0])
+            return None
+
+        if annotation in (list, tuple, set, frozenset) or origin in (list, tuple, set, frozenset):
+            self.multiple = True
+            container = origin or annotation
+            item_convert = _Parameter(self.name, args[0], False).convert if args else None
+            return self._compile_sequence(container, item_convert)
+
+        if annotation is bool:
+            return _to_bool
+        if annotation in (int, float):
+            return annotation
+        if annotation is dict or origin is dict:
+            return lambda value: _load_json(value, dict)
+        if typing.is_typeddict(annotation):
+            required_keys = annotation.__required_keys__
+
+            def convert_typeddict(value):
+                data = _load_json(value, dict)
+                absent = required_keys - data.keys()
+                if absent:
+                    raise ValueError(f"clés manquantes: {', '.join(sorted(absent))}")
+                return data
+            return convert_typeddict
+        if dataclasses.is_dataclass(annotation):
+            return lambda value: annotation(**_load_json(value, dict))
+        if annotation in (datetime.date, datetime.datetime, datetime.time):
+            return annotation.fromisoformat
+
+        # Type inconnu: la valeur brute est transmise comme auparavant
+        return None
+
+    def _compile_sequence(self, container, item_convert):
+        def convert_sequence(values):
+            items = []
+            for value in values:
+                if value.startswith('['):
+                    items.extend(_load_json(value, list))
+                else:
+                    items.extend(part.strip() for part in value.split(',') if part.strip())
+
+            if item_convert:
+                items = [item_convert(item) if isinstance(item, str) else item for item in items]
+            return container(items)
+        return convert_sequence
+
+
+class ArgumentBinder:
+    """
+    Liaison des paramètres de requête aux arguments d'un @entrypoint.
+    Compilé une seule fois au chargement du script: la requête n'a plus besoin d'inspecter la signature.
+    """
+    def __init__(self, func):
+        try:
+            hints = typing.get_type_hints(func)
+        except Exception:
+            hints = {}
+
+        self.parameters = []
+        self.accepts_kwargs = False
+        for name, param in inspect.signature(func).parameters.items():
+            if param.kind == inspect.Parameter.VAR_KEYWORD:
+                self.accepts_kwargs = True
+                continue
+            if param.kind == inspect.Parameter.VAR_POSITIONAL:
+                continue
+
+            annotation = hints.get(name, param.annotation)
+            self.parameters.append(_Parameter(name, annotation, param.default is inspect.Parameter.empty))
+
+        self.names = {param.name for param in self.parameters}
+
+    def bind(self, query_params):
+        getlist = getattr(query_params, 'getlist', None)
+
+        call_args = {}
+        errors = []
+        for param in self.parameters:
+            if param.name not in query_params:
+                if param.required:
+                    errors.append({"argument": param.name, "error": "missing", "expected": param.type_name})
+                continue
+
+            if param.multiple:
+                value = getlist(param.name) if getlist else [query_params[param.name]]
+            else:
+                value = query_params[param.name]
+
+            if param.convert is None:
+                call_args[param.name] = value
+                continue
+
+            try:
+                call_args[param.name] = param.convert(value)
+            except (ValueError, TypeError) as err:
+                errors.append({"argument": param.name, "error": "invalid", "expected": param.type_name, "detail": str(err)})
+
+        if errors:
+            raise BindingError(errors)
+
+        if self.accepts_kwargs:
+            for name in query_params:
+                if name not in self.names:
+                    call_args[name] = query_params[name]
+
+        return call_args
+
+    def describe(self):
+        return [{"name": param.name, "type": param.type_name, "required": param.required} for param in self.parameters]
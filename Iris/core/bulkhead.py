@@ -0,0 +1,65 @@
+import threading
+
+
+class Bulkhead:
+    """
+    Compteur d'exécutions simultanées d'un script, avec limite optionnelle.
+    La limite est passée à chaque acquisition pour suivre les changements faits dans le panneau d'administration.
+    """
+    def __init__(self, script_id):
+        self.script_id = script_id
+        self.active = 0
+        self.peak = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, limit=None):
+        with self._lock:
+            if limit and self.active >= limit:
+                self.rejected += 1
+                return False
+
+            self.active += 1
+            if self.active > self.peak:
+                self.peak = self.active
+            return True
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+            self.completed += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self):
+        return {
+            "active": self.active,
+            "peak": self.peak,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+class BulkheadRegistry:
+    def __init__(self):
+        self._bulkheads = {}
+        self._lock = threading.Lock()
+
+    def get(self, script_id):
+        bulkhead = self._bulkheads.get(script_id)
+        if bulkhead is None:
+            with self._lock:
+                bulkhead = self._bulkheads.setdefault(script_id, Bulkhead(script_id))
+
+        return bulkhead
+
+    def stats(self):
+        return {script_id: bulkhead.stats() for script_id, bulkhead in list(self._bulkheads.items())}
+
+
+bulkheads = BulkheadRegistry()
@@ -0,0 +1,142 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class CachePolicy:
+    def __init__(self, ttl, max_entries, per_token):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.per_token = per_token
+
+
+def resolve_cache_policy(script_db, loaded_script):
+    """
+    Politique de cache d'un script: réglages de la ligne ApiScript, sinon options de @entrypoint.
+    Renvoie None si le cache n'est pas activé.
+    """
+    options = getattr(loaded_script.entrypoint, '_entrypoint_options', {})
+
+    ttl = script_db.cache_ttl or options.get('cache_ttl')
+    if not ttl:
+        return None
+
+    max_entries = script_db.cache_max_entries or options.get('cache_max_entries') or DEFAULT_MAX_ENTRIES
+    per_token = bool(script_db.cache_per_token or options.get('cache_per_token', False))
+
+    return CachePolicy(ttl, max_entries, per_token)
+
+
+class CachedResponse:
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, body, etag=None):
+        self.body = body
+        self.etag = etag
+
+
+def make_cache_key(call_args, token=None):
+    # Arguments après liaison: l'ordre et les paramètres inconnus de la requête n'influencent pas la clé
+    return (json.dumps(call_args, sort_keys=True, default=repr), token)
+
+
+class _ScriptCache:
+    def __init__(self):
+        self.entries = OrderedDict() # key -> (expires_at, CachedResponse)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def _remove(self, key):
+        expires_at, cached = self.entries.pop(key)
+        self.size -= len(cached.body)
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expires_at, cached = item
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return cached
+
+    def put(self, key, cached, ttl, max_entries):
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+            self.entries[key] = (time.monotonic() + ttl, cached)
+            self.size += len(cached.body)
+
+            while len(self.entries) > max_entries:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class ResultCache:
+    """
+    Cache LRU/TTL des réponses d'API, par script.
+    Le corps JSON déjà encodé et son ETag sont conservés: un hit ne ré-exécute ni ne ré-encode le résultat.
+    """
+    def __init__(self, max_entry_bytes=1024 * 1024):
+        self.max_entry_bytes = max_entry_bytes
+        self._scripts = {}
+        self._lock = threading.Lock()
+
+    def _script_cache(self, script_id):
+        script_cache = self._scripts.get(script_id)
+        if script_cache is None:
+            with self._lock:
+                script_cache = self._scripts.setdefault(script_id, _ScriptCache())
+
+        return script_cache
+
+    def get(self, script_id, key):
+        return self._script_cache(script_id).get(key)
+
+    def put(self, script_id, key, body, policy, etag=None):
+        if self.max_entry_bytes and len(body) > self.max_entry_bytes:
+            return
+
+        self._script_cache(script_id).put(key, CachedResponse(body, etag), policy.ttl, policy.max_entries)
+
+    def purge(self, script_id=None):
+        if script_id is None:
+            for script_cache in list(self._scripts.values()):
+                script_cache.clear()
+        elif script_id in self._scripts:
+            self._scripts[script_id].clear()
+
+    def stats(self):
+        return {script_id: script_cache.stats() for script_id, script_cache in list(self._scripts.items())}
+
+
+result_cache = ResultCache()
@@ -0,0 +1,239 @@
+import time
+import zlib
+import threading
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Types de réponses compressés en plus de text/*
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml', 'image/svg+xml'}
+# Seules les réponses de l'API et du panneau d'administration sont compressées
+COMPRESSED_BLUEPRINTS = ('api', 'admin')
+DEFAULT_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 6}
+
+
+class _GzipEncoder:
+    def __init__(self, level):
+        # wbits=31: en-tête et somme de contrôle gzip
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+ENCODERS = {'gzip': _GzipEncoder}
+if brotli is not None:
+    ENCODERS['br'] = _BrotliEncoder
+if zstandard is not None:
+    ENCODERS['zstd'] = _ZstdEncoder
+
+
+def resolve_compression(script_db, loaded_script):
+    """
+    Compression des réponses d'un script: réglage de la ligne ApiScript, sinon option de @entrypoint (activée par défaut).
+    """
+    if script_db.compress is not None:
+        return script_db.compress
+
+    options = getattr(loaded_script.entrypoint, '_entrypoint_options', {})
+    return bool(options.get('compress', True))
+
+
+class _CompressionStats:
+    def __init__(self):
+        self.responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.duration = 0.0
+
+
+class ResponseCompressor:
+    """
+    Compression des réponses selon l'en-tête Accept-Encoding (gzip, et br/zstd si les modules sont installés).
+    Les réponses en flux sont compressées morceau par morceau; le temps de compression est mesuré par script.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.min_size = 1024
+        self.algorithms = []
+        self.levels = dict(DEFAULT_LEVELS)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def configure(self, enable=True, min_size=1024, algorithms=('br', 'zstd', 'gzip'), levels=None):
+        unknown = [name for name in algorithms if name not in DEFAULT_LEVELS]
+        if unknown:
+            raise ValueError(f"Algorithme de compression inconnu: {', '.join(unknown)}")
+
+        self.enabled = enable
+        self.min_size = min_size
+        # Ordre de préférence du serveur, limité aux modules installés
+        self.algorithms = [name for name in algorithms if name in ENCODERS]
+        self.levels.update(levels or {})
+
+    def negotiate(self, accept_encodings):
+        if not self.algorithms:
+            return None
+
+        return accept_encodings.best_match(self.algorithms)
+
+    def _record(self, key, bytes_in, bytes_out, duration):
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _CompressionStats()
+            stats.responses += 1
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+            stats.duration += duration
+
+    def _stream(self, chunks, encoding, key):
+        encoder = ENCODERS[encoding](self.levels[encoding])
+        bytes_in = bytes_out = 0
+        duration = 0.0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                if not chunk:
+                    continue
+
+                # Vidage après chaque morceau: le client reçoit les éléments au fil de l'eau
+                start = time.perf_counter()
+                data = encoder.compress(chunk) + encoder.flush()
+                duration += time.perf_counter() - start
+
+                bytes_in += len(chunk)
+                bytes_out += len(data)
+                yield data
+
+            start = time.perf_counter()
+            data = encoder.finish()
+            duration += time.perf_counter() - start
+            bytes_out += len(data)
+            yield data
+        finally:
+            # Fermeture du flux d'origine, y compris si le client se déconnecte
+            close = getattr(chunks, 'close', None)
+            if close:
+                close()
+            # Flux vide ou interrompu avant le premier morceau: pas de taux de compression à enregistrer
+            if bytes_in:
+                self._record(key, bytes_in, bytes_out, duration)
+
+    def after_request(self, response):
+        if not self.enabled or request.blueprint not in COMPRESSED_BLUEPRINTS:
+            return response
+
+        # Désactivée pour ce script
+        if not getattr(request, 'compress', True):
+            return response
+
+        if request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 304):
+            return response
+
+        if response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return response
+
+        mimetype = response.mimetype or ''
+        if mimetype not in COMPRESSIBLE_MIMETYPES and not mimetype.startswith('text/'):
+            return response
+
+        if not response.is_streamed and response.calculate_content_length() < self.min_size:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        key = getattr(request, 'api_name', None) or request.endpoint
+
+        if response.is_streamed:
+            response.response = self._stream(response.response, encoding, key)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+
+            start = time.perf_counter()
+            encoder = ENCODERS[encoding](self.levels[encoding])
+            body = encoder.compress(data) + encoder.finish()
+            duration = time.perf_counter() - start
+
+            self._record(key, len(data), len(body), duration)
+            response.set_data(body)
+            response.headers['Server-Timing'] = f"compress;dur={duration * 1000:.2f}"
+
+        # Représentation différente de la réponse non compressée: l'ETag porte le suffixe de l'encodage
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak)
+
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                key: {
+                    "responses": stats.responses,
+                    "bytes_in": stats.bytes_in,
+                    "bytes_out": stats.bytes_out,
+                    "ratio": round(stats.bytes_out / stats.bytes_in, 3) if stats.bytes_in else None,
+                    "avg_ms": round(stats.duration * 1000 / stats.responses, 2) if stats.responses else None,
+                }
+                for key, stats in self._stats.items()
+            }
+
+    def reset(self, key=None):
+        with self._lock:
+            if key is None:
+                self._stats.clear()
+            else:
+                self._stats.pop(key, None)
+
+
+compression = ResponseCompressor()
@@ -1,8 +1,16 @@
 
-def entrypoint(func):
+def entrypoint(func=None, **options):
     """
     Décorateur pour marquer la fonction principale d'un script API.
+    Utilisable seul (@entrypoint) ou avec des options (@entrypoint(executor="process")).
     """
-    # On attache un attribut à la fonction pour pouvoir l'identifier plus tard.
-    func._is_entrypoint = True
-    return func
+    def decorator(func):
+        # On attache un attribut à la fonction pour pouvoir l'identifier plus tard.
+        func._is_entrypoint = True
+        func._entrypoint_options = options
+        return func
+
+    if func is None:
+        return decorator
+
+    return decorator(func)
@@ -1,21 +1,21 @@
-import threading
+import contextvars
 
-_current_environment = threading.local()
+# ContextVar plutôt que threading.local: la valeur suit aussi les tâches asyncio
+_current_environment = contextvars.ContextVar('iris_environment', default=None)
 
 def set_environment(env):
-    _current_environment.value = env
+    _current_environment.set(env)
 
 def get_environment():
-    return getattr(_current_environment, 'value', None)
+    return _current_environment.get()
 
 class EnvironmentContext:
     def __init__(self, env):
         self.env = env
-        self.old_env = None
+        self.token = None
 
     def __enter__(self):
-        self.old_env = get_environment()
-        set_environment(self.env)
+        self.token = _current_environment.set(self.env)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        set_environment(self.old_env)
+        _current_environment.reset(self.token)
@@ -0,0 +1,59 @@
+import hashlib
+from flask import request, current_app
+from core.compression import DEFAULT_LEVELS
+
+
+def make_etag(body, version=None):
+    """
+    ETag fort d'une réponse: calculé depuis la clé de version fournie par le script, sinon depuis le corps encodé.
+    """
+    if version is not None:
+        digest = hashlib.blake2b(repr(version).encode('utf-8'), digest_size=16, person=b'iris-version').hexdigest()
+    else:
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    return f'"{digest}"'
+
+
+def resolve_cache_control(script_db, loaded_script):
+    """
+    En-tête Cache-Control d'un script: réglage de la ligne ApiScript, sinon option de @entrypoint.
+    """
+    options = getattr(loaded_script.entrypoint, '_entrypoint_options', {})
+    return script_db.cache_control or options.get('cache_control')
+
+
+def match_etag(etag):
+    """
+    Renvoie l'ETag de If-None-Match correspondant à la réponse, ou None.
+    Les variantes compressées portent le suffixe de leur encodage ("...-gzip") et correspondent aussi.
+    """
+    if request.method not in ('GET', 'HEAD') or not request.if_none_match:
+        return None
+
+    if request.if_none_match.star_tag:
+        return etag
+
+    digest = etag.strip('"')
+    for tag in request.if_none_match.as_set(include_weak=True):
+        if tag == digest:
+            return f'"{tag}"'
+
+        base, _, encoding = tag.rpartition('-')
+        if base == digest and encoding in DEFAULT_LEVELS:
+            return f'"{tag}"'
+
+    return None
+
+
+def set_validators(response, etag, cache_control=None):
+    response.headers['ETag'] = etag
+    if cache_control:
+        response.headers['Cache-Control'] = cache_control
+
+    return response
+
+
+def not_modified(etag, cache_control=None):
+    # Réponse 304 sans corps: le client réutilise la représentation qu'il possède déjà
+    return set_validators(current_app.response_class(status=304), etag, cache_control)
@@ -0,0 +1,278 @@
+import os
+import asyncio
+import inspect
+import threading
+import contextvars
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from models.database import ApiScript
+from core.environment_manager import EnvironmentContext
+from core.fabric import registry
+from core.accounting import measure
+from core.logging import logs
+
+
+EXECUTORS = ('thread', 'process')
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+_process_workers = None
+_fabric_dir = 'fabric'
+
+_event_loop = None
+_event_loop_lock = threading.Lock()
+
+_thread_pool = None
+_thread_pool_lock = threading.Lock()
+_thread_workers = 32
+
+_batch_pool = None
+_batch_pool_lock = threading.Lock()
+_batch_workers = 8
+
+
+class ExecutionTimeout(Exception):
+    """
+    Le point d'entrée n'a pas terminé dans le délai imparti.
+    """
+
+
+def resolve_executor(script_db, loaded_script):
+    """
+    Mode d'exécution d'un script: celui de la ligne ApiScript, sinon celui du décorateur @entrypoint.
+    """
+    options = getattr(loaded_script.entrypoint, '_entrypoint_options', {})
+    mode = script_db.executor or options.get('executor') or 'thread'
+    if mode not in EXECUTORS:
+        raise ValueError(f"Mode d'exécution inconnu pour {script_db.id}: {mode}")
+
+    return mode
+
+
+def get_event_loop():
+    """
+    Boucle asyncio partagée par le processus, exécutée dans un thread dédié.
+    Les points d'entrée 'async def' y sont planifiés au lieu d'un asyncio.run() par appel.
+    """
+    global _event_loop
+
+    if _event_loop is None:
+        with _event_loop_lock:
+            if _event_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='iris-event-loop', daemon=True).start()
+                _event_loop = loop
+
+    return _event_loop
+
+
+async def _await_with_environment(awaitable, api_context, usage=None):
+    # Le contexte est posé dans la tâche: les sous-tâches créées par le script en héritent
+    with EnvironmentContext(api_context), measure(usage, cpu=False):
+        return await awaitable
+
+
+def _submit_coroutine(awaitable, api_context, usage=None):
+    return asyncio.run_coroutine_threadsafe(_await_with_environment(awaitable, api_context, usage), get_event_loop())
+
+
+def run_coroutine(awaitable, api_context, usage=None):
+    return _submit_coroutine(awaitable, api_context, usage).result()
+
+
+def _call_entrypoint(loaded_script, call_args, api_context, usage=None):
+    if loaded_script.is_coroutine:
+        return run_coroutine(loaded_script.entrypoint(**call_args), api_context, usage)
+
+    with EnvironmentContext(api_context), measure(usage):
+        result = loaded_script.entrypoint(**call_args)
+
+    # Point d'entrée synchrone qui renvoie un awaitable (wrapper, functools.partial...)
+    if inspect.isawaitable(result):
+        return run_coroutine(result, api_context, usage)
+
+    return result
+
+
+def _load_in_process(script_id, script_path):
+    return registry.get(script_id, script_path)
+
+
+def _init_worker(preload):
+    # Précharge les scripts déclarés en mode process pour que le premier appel ne paie pas l'import
+    for script_id, script_path in preload:
+        try:
+            _load_in_process(script_id, script_path)
+        except Exception as err:
+            logs(f"Erreur lors du préchargement de {script_id} dans le worker: {err}", status='error', component='system')
+
+
+def _warm_worker():
+    return os.getpid()
+
+
+def _run_in_process(script_id, script_path, call_args, context_state, usage=None):
+    from views.api_views import ApiContext
+
+    loaded_script = _load_in_process(script_id, script_path)
+    api_context = ApiContext.from_state(context_state)
+    result = _call_entrypoint(loaded_script, call_args, api_context, usage)
+
+    # Mesures et version (set_version) faites dans le worker: renvoyées avec le résultat
+    return result, usage.to_state() if usage is not None else None, api_context.version
+
+
+def process_scripts(fabric_dir):
+    """
+    Scripts en ligne exécutés en mode 'process', par leur ligne ApiScript ou par le décorateur @entrypoint: (id, chemin).
+    """
+    scripts = []
+    for script_db in ApiScript.query.filter_by(is_online=True).all():
+        if not script_db.path:
+            continue
+
+        script_path = os.path.join(fabric_dir, script_db.path)
+        try:
+            if resolve_executor(script_db, registry.get(script_db.id, script_path)) == 'process':
+                scripts.append((script_db.id, script_path))
+        except Exception:
+            # Script en erreur: signalé par la synchronisation du dossier fabric
+            continue
+
+    return scripts
+
+
+def configure_process_pool(workers, fabric_dir):
+    global _process_workers, _fabric_dir
+    _process_workers = workers
+    _fabric_dir = fabric_dir
+
+
+def start_process_pool(workers=None, preload=None):
+    """
+    Démarre le pool de processus utilisé par les scripts en mode 'process'.
+    Les workers sont lancés en 'spawn' pour ne pas hériter des connexions et verrous du serveur.
+    Sans liste explicite, les scripts en mode 'process' du dossier fabric sont préchargés dans chaque worker.
+    """
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is None:
+            workers = workers or _process_workers or os.cpu_count() or 1
+            if preload is None:
+                preload = process_scripts(_fabric_dir)
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(list(preload),)
+            )
+
+            # Lance les workers dès le démarrage plutôt qu'au premier appel
+            for _ in range(workers):
+                _process_pool.submit(_warm_worker)
+
+    return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+def configure_thread_pool(workers):
+    global _thread_workers
+    _thread_workers = workers
+
+
+def _get_thread_pool():
+    global _thread_pool
+
+    if _thread_pool is None:
+        with _thread_pool_lock:
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(max_workers=_thread_workers, thread_name_prefix='iris-script')
+
+    return _thread_pool
+
+
+def configure_batch_pool(workers):
+    global _batch_workers
+    _batch_workers = workers
+
+
+def submit_batch(func, *args):
+    """
+    Soumet un appel d'un lot (/api/_batch) au pool dédié, borné par batch.workers.
+    Pool séparé du pool des timeouts: un élément du lot peut lui-même attendre un appel avec délai.
+    """
+    global _batch_pool
+
+    if _batch_pool is None:
+        with _batch_pool_lock:
+            if _batch_pool is None:
+                _batch_pool = ThreadPoolExecutor(max_workers=_batch_workers, thread_name_prefix='iris-batch')
+
+    # Une copie du contexte par appel: un même contexte ne peut pas être actif dans deux threads
+    context = contextvars.copy_context()
+    return _batch_pool.submit(context.run, func, *args)
+
+
+def _submit(loaded_script, call_args, api_context, mode, usage=None):
+    if mode == 'process':
+        pool = _process_pool or start_process_pool()
+        return pool.submit(_run_in_process, loaded_script.script_id, loaded_script.path, call_args, api_context.to_state(), usage)
+
+    if loaded_script.is_coroutine:
+        return _submit_coroutine(loaded_script.entrypoint(**call_args), api_context, usage)
+
+    # Copie du contexte courant: la requête Flask reste accessible depuis le thread du pool
+    context = contextvars.copy_context()
+    return _get_thread_pool().submit(context.run, _call_entrypoint, loaded_script, call_args, api_context, usage)
+
+
+def run_entrypoint(loaded_script, call_args, api_context, mode='thread', timeout=None, on_done=None, usage=None):
+    """
+    Exécute le point d'entrée dans le mode demandé.
+    Avec un timeout, l'appelant est libéré après le délai (ExecutionTimeout) même si le script continue.
+    on_done est appelé une seule fois, à la fin réelle de l'exécution.
+    usage (ResourceUsage) reçoit les mesures faites dans le thread ou le processus qui exécute le script.
+    """
+    if mode == 'thread' and not timeout and not loaded_script.is_coroutine:
+        try:
+            return _call_entrypoint(loaded_script, call_args, api_context, usage)
+        finally:
+            if on_done:
+                on_done()
+
+    try:
+        future = _submit(loaded_script, call_args, api_context, mode, usage)
+    except BaseException:
+        if on_done:
+            on_done()
+        raise
+
+    if on_done:
+        future.add_done_callback(lambda _: on_done())
+
+    try:
+        result = future.result(timeout)
+        if mode == 'process':
+            result, state, version = result
+            if usage is not None:
+                usage.update(state)
+            if version is not None:
+                api_context.set_version(version)
+        return result
+    except FutureTimeoutError:
+        if future.done():
+            # TimeoutError levée par le script lui-même
+            raise
+
+        # Annule la tâche asyncio ou l'appel encore en file; un thread/process déjà lancé va à son terme
+        future.cancel()
+        raise ExecutionTimeout(f"Délai d'exécution dépassé ({timeout}s)")
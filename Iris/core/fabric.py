@@ -1,9 +1,120 @@
 import importlib.util
-import sys
+import os
 import inspect
+import hashlib
+import threading
 from models.database import db, ApiScript
 from pathlib import Path
 from core.logging import logs
+from core.binder import ArgumentBinder
+from core.importer import ScriptImporter
+from core.cache import result_cache
+
+
+def find_entrypoint(module):
+    for name, func in inspect.getmembers(module, inspect.isfunction):
+        if hasattr(func, '_is_entrypoint') and func._is_entrypoint:
+            return func
+
+    return None
+
+
+class LoadedScript:
+    """
+    Script fabric chargé en mémoire avec son point d'entrée résolu.
+    """
+    def __init__(self, script_id, path, module, entrypoint, mtime, size, digest, importer=None):
+        self.script_id = script_id
+        self.path = path
+        self.module = module
+        self.entrypoint = entrypoint
+        self.is_coroutine = inspect.iscoroutinefunction(entrypoint)
+        self.is_stream = inspect.isgeneratorfunction(entrypoint) or inspect.isasyncgenfunction(entrypoint)
+        # Liaison des arguments compilée une seule fois par chargement
+        self.binder = ArgumentBinder(entrypoint) if entrypoint else None
+        self.mtime = mtime
+        self.size = size
+        self.digest = digest
+        # Modules voisins importés par le script, chargés dans son propre espace de noms
+        self.importer = importer
+
+    def is_fresh(self, path, stat):
+        return self.path == path and self.mtime == stat.st_mtime_ns and self.size == stat.st_size and self.dependencies_fresh()
+
+    def dependencies_fresh(self):
+        return self.importer is None or self.importer.is_fresh()
+
+
+class ScriptRegistry:
+    """
+    Registre des scripts fabric chargés, indexé par id de script.
+    Le module n'est ré-exécuté que si le fichier a changé (mtime/taille, puis hash du contenu).
+    """
+    def __init__(self):
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _script_lock(self, script_id):
+        with self._lock:
+            return self._locks.setdefault(script_id, threading.Lock())
+
+    def get(self, script_id, script_path):
+        try:
+            stat = os.stat(script_path)
+        except FileNotFoundError:
+            self.invalidate(script_id)
+            raise
+
+        # Chemin rapide: fichier inchangé depuis le dernier chargement
+        entry = self._entries.get(script_id)
+        if entry and entry.is_fresh(script_path, stat):
+            return entry
+
+        with self._script_lock(script_id):
+            entry = self._entries.get(script_id)
+            if entry and entry.is_fresh(script_path, stat):
+                return entry
+
+            with open(script_path, 'rb') as f:
+                source = f.read()
+            digest = hashlib.sha256(source).hexdigest()
+
+            # mtime modifié (touch, checkout...) mais contenu identique: pas de rechargement
+            if entry and entry.path == script_path and entry.digest == digest and entry.dependencies_fresh():
+                entry.mtime = stat.st_mtime_ns
+                entry.size = stat.st_size
+                return entry
+
+            entry = self._load(script_id, script_path, source, digest, stat)
+            if entry.is_stream and getattr(entry.entrypoint, '_entrypoint_options', {}).get('executor') == 'process':
+                logs(f"Script {script_id}: executor='process' ignoré, un générateur est exécuté dans le thread de la requête", status='warning', component='system')
+            self._entries[script_id] = entry
+            # Les résultats mis en cache par l'ancienne version du script ne sont plus valides
+            result_cache.purge(script_id)
+            return entry
+
+    def _load(self, script_id, script_path, source, digest, stat):
+        spec = importlib.util.spec_from_file_location(script_id, script_path)
+        module = importlib.util.module_from_spec(spec)
+
+        # Imports voisins résolus depuis le dossier du script, sans passer par sys.path ni sys.modules
+        importer = ScriptImporter(os.path.dirname(script_path))
+        importer.prepare(module)
+
+        code = compile(source, script_path, 'exec')
+        exec(code, module.__dict__)
+
+        return LoadedScript(script_id, script_path, module, find_entrypoint(module), stat.st_mtime_ns, stat.st_size, digest, importer)
+
+    def invalidate(self, script_id):
+        self._entries.pop(script_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+registry = ScriptRegistry()
 
 
 def refresh_db(FABRIC_DIR):
@@ -11,6 +122,8 @@ def refresh_db(FABRIC_DIR):
 
     # Scripts trouvés sur le FS : {basename: path_rel}
     scripts_in_fs = {}
+    # Scripts présents mais en erreur de chargement : conservés en base et signalés dans l'administration
+    load_errors = {}
     for p in fabric_path.rglob("*.py"):
         if p.is_file() and p.name != "core.py":
             script_id = p.stem
@@ -18,24 +131,17 @@ def refresh_db(FABRIC_DIR):
             
             # Dynamically load the module and check for entrypoint decorator
             try:
-                spec = importlib.util.spec_from_file_location(script_id, p)
-                module = importlib.util.module_from_spec(spec)
-                sys.modules[script_id] = module
-                spec.loader.exec_module(module)
-
-                has_entrypoint = False
-                for name, obj in inspect.getmembers(module):
-                    if inspect.isfunction(obj) and hasattr(obj, '_is_entrypoint') and obj._is_entrypoint:
-                        has_entrypoint = True
-                        break
-                
-                if has_entrypoint:
+                # Chargement via le registre: pas d'entrée dans sys.modules, deux scripts de même nom ne se chevauchent plus
+                loaded_script = registry.get(script_id, str(p))
+
+                if loaded_script.entrypoint:
                     scripts_in_fs[script_id] = script_path_rel
                 else:
                     logs(f"Script {script_id} ignored: no entrypoint decorator found.", status='info', component='system')
 
             except Exception as e:
                 logs(f"Error loading script {script_id} from {p}: {e}", status='error', component='system')
+                load_errors[script_id] = (script_path_rel, f"{type(e).__name__}: {e}")
                 continue
 
     # Scripts en DB sous forme {id: path}
@@ -46,7 +152,11 @@ def refresh_db(FABRIC_DIR):
     to_add = scripts_in_fs.keys() - scripts_in_db.keys()
 
     # Suppressions : id présent en DB mais plus sur FS
-    to_delete = scripts_in_db.keys() - scripts_in_fs.keys()
+    to_delete = {
+        script_id
+        for script_id in scripts_in_db.keys() - scripts_in_fs.keys()
+        if script_id not in load_errors or load_errors[script_id][0] != scripts_in_db[script_id]
+    }
 
     # Mises à jour : id présent mais chemin différent
     to_update = {
@@ -72,6 +182,11 @@ def refresh_db(FABRIC_DIR):
             script_obj = db.session.query(ApiScript).get(script_id)
             script_obj.path = scripts_in_fs[script_id]
 
+        # Erreurs de chargement
+        for script_obj in db.session.query(ApiScript).filter(ApiScript.id.in_(list(scripts_in_db.keys() - to_delete))).all():
+            error = load_errors.get(script_obj.id)
+            script_obj.load_error = error[1] if error else None
+
         db.session.commit()
     except Exception as err:
         logs(f"Erreur lors de la synchronisation des scripts", status='error', component='system', result=err)
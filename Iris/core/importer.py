@@ -0,0 +1,146 @@
+import os
+import sys
+import builtins
+import threading
+import importlib.util
+
+
+_builtin_import = builtins.__import__
+
+
+class ScriptImporter:
+    """
+    Résolution des imports d'un script fabric depuis son propre dossier.
+    Remplace l'ajout du dossier à sys.path: rien n'est modifié dans sys.path ni sys.modules,
+    les modules voisins sont chargés dans un espace de noms propre au script.
+    """
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        self.modules = {}   # nom complet -> module chargé depuis le dossier du script
+        self.resolved = {}  # nom de premier niveau -> True si module du dossier, False si import standard
+        self.files = {}     # fichiers chargés -> mtime, pour détecter une modification d'un module voisin
+        self.builtins = dict(builtins.__dict__)
+        self.builtins['__import__'] = self._import
+        self._lock = threading.RLock()
+
+    def prepare(self, module):
+        # Les imports du module passent par cet importer
+        module.__dict__['__builtins__'] = self.builtins
+
+    def is_fresh(self):
+        for path, mtime in list(self.files.items()):
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return False
+            except FileNotFoundError:
+                return False
+
+        return True
+
+    def _locate(self, directory, name):
+        path = os.path.join(directory, name + '.py')
+        if os.path.isfile(path):
+            return path, False
+
+        path = os.path.join(directory, name, '__init__.py')
+        if os.path.isfile(path):
+            return path, True
+
+        return None, False
+
+    def _is_local(self, name):
+        local = self.resolved.get(name)
+        if local is None:
+            # Comme avec sys.path.append, les modules installés restent prioritaires sur ceux du dossier
+            try:
+                found = name in sys.modules or importlib.util.find_spec(name) is not None
+            except (ImportError, ValueError):
+                found = False
+
+            local = not found and self._locate(self.directory, name)[0] is not None
+            self.resolved[name] = local
+
+        return local
+
+    def _load(self, fullname, directory, name):
+        module = self.modules.get(fullname)
+        if module is not None:
+            return module
+
+        with self._lock:
+            module = self.modules.get(fullname)
+            if module is not None:
+                return module
+
+            path, is_package = self._locate(directory, name)
+            if path is None:
+                raise ModuleNotFoundError(f"No module named '{fullname}'", name=fullname)
+
+            spec = importlib.util.spec_from_file_location(fullname, path, submodule_search_locations=[os.path.dirname(path)] if is_package else None)
+            module = importlib.util.module_from_spec(spec)
+            self.prepare(module)
+
+            with open(path, 'rb') as f:
+                source = f.read()
+            self.files[path] = os.stat(path).st_mtime_ns
+
+            # Enregistré avant l'exécution pour supporter les imports circulaires entre voisins
+            self.modules[fullname] = module
+            try:
+                exec(compile(source, path, 'exec'), module.__dict__)
+            except BaseException:
+                del self.modules[fullname]
+                raise
+
+            if '.' in fullname:
+                parent, _, child = fullname.rpartition('.')
+                setattr(self.modules[parent], child, module)
+
+            return module
+
+    def _load_name(self, fullname):
+        parts = fullname.split('.')
+        module = self._load(parts[0], self.directory, parts[0])
+        top = module
+        for index in range(1, len(parts)):
+            if not hasattr(module, '__path__'):
+                raise ModuleNotFoundError(f"No module named '{fullname}'; '{module.__name__}' is not a package", name=fullname)
+            module = self._load('.'.join(parts[:index + 1]), module.__path__[0], parts[index])
+
+        return top, module
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level > 0:
+            package = (globals or {}).get('__package__') or ''
+            if package.partition('.')[0] not in self.modules:
+                return _builtin_import(name, globals, locals, fromlist, level)
+
+            base = package.rsplit('.', level - 1)[0] if level > 1 else package
+            fullname = f"{base}.{name}" if name else base
+            top, module = self._load_name(fullname)
+            return self._handle_fromlist(module, fromlist) if fromlist else module
+
+        if not self._is_local(name.partition('.')[0]):
+            return _builtin_import(name, globals, locals, fromlist, level)
+
+        top, module = self._load_name(name)
+        if fromlist:
+            return self._handle_fromlist(module, fromlist)
+
+        return top
+
+    def _handle_fromlist(self, module, fromlist):
+        if not hasattr(module, '__path__'):
+            return module
+
+        for item in fromlist:
+            if item == '*':
+                self._handle_fromlist(module, getattr(module, '__all__', ()))
+            elif not hasattr(module, item):
+                try:
+                    self._load(f"{module.__name__}.{item}", module.__path__[0], item)
+                except ModuleNotFoundError:
+                    # Attribut absent: l'ImportError est levée par l'instruction from ... import
+                    pass
+
+        return module
@@ -0,0 +1,156 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from models.database import db, ApiJob
+from core.logging import logs
+from core.executor import run_entrypoint, ExecutionTimeout
+from core.streaming import is_stream_result, iter_stream
+from core.serializer import dumps
+from core.accounting import accounting
+
+
+class JobManager:
+    """
+    Exécution des appels d'API en tâche de fond.
+    Les appels sont mis en file dans un pool de threads du processus; l'état et le résultat sont persistés dans ApiJob.
+    """
+    def __init__(self, workers=4, ttl=3600):
+        self.app = None
+        self.workers = workers
+        self.ttl = ttl
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.durations = deque(maxlen=200)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._last_purge = 0
+
+    def configure(self, app, workers=4, ttl=3600):
+        self.app = app
+        self.workers = workers
+        self.ttl = ttl
+
+        # Le pool est en mémoire: les tâches d'une exécution précédente du serveur ne reprendront pas
+        interrupted = ApiJob.query.filter(ApiJob.status.in_(('queued', 'running'))).all()
+        for job in interrupted:
+            job.status = 'error'
+            job.error = "Tâche interrompue par un redémarrage du serveur"
+            job.finished_at = datetime.utcnow()
+            job.expires_at = job.finished_at + timedelta(seconds=self.ttl)
+        if interrupted:
+            db.session.commit()
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='iris-job')
+
+        return self._pool
+
+    def submit(self, script_db, loaded_script, call_args, api_context, mode, bulkhead):
+        """
+        Met l'appel en file. La place du bulkhead, déjà acquise par l'appelant, est libérée à la fin réelle de l'exécution.
+        """
+        self.purge_expired()
+
+        job = ApiJob(script_id=script_db.id, token=api_context.token, status='queued')
+        db.session.add(job)
+        db.session.commit()
+
+        with self._lock:
+            self.queued += 1
+
+        self._get_pool().submit(self._run, job.id, loaded_script, call_args, api_context, mode, script_db.timeout, bulkhead)
+        return job
+
+    def _run(self, job_id, loaded_script, call_args, api_context, mode, timeout, bulkhead):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+
+        with self.app.app_context():
+            try:
+                job = db.session.get(ApiJob, job_id)
+                job.status = 'running'
+                job.started_at = datetime.utcnow()
+                db.session.commit()
+            except BaseException:
+                bulkhead.release()
+                raise
+
+            start = time.perf_counter()
+            usage = accounting.new_usage()
+            try:
+                if loaded_script.is_stream:
+                    # Pas de flux HTTP pour une tâche: le générateur est consommé et le résultat stocké en liste
+                    try:
+                        result = list(iter_stream(loaded_script.entrypoint(**call_args), api_context, usage, timeout))
+                    finally:
+                        bulkhead.release()
+                else:
+                    result = run_entrypoint(loaded_script, call_args, api_context, mode, timeout=timeout, on_done=bulkhead.release, usage=usage)
+                    if is_stream_result(result):
+                        result = list(iter_stream(result, api_context, usage))
+
+                body = dumps(result)
+                job.result = body.decode('utf-8')
+                if usage:
+                    usage.result_size = len(body)
+                job.status = 'success'
+            except ExecutionTimeout as err:
+                bulkhead.record_timeout()
+                job.status = 'timeout'
+                job.error = str(err)
+            except Exception as err:
+                job.status = 'error'
+                job.error = str(err)
+
+            duration_ms = int((time.perf_counter() - start) * 1000)
+            job.finished_at = datetime.utcnow()
+            job.duration_ms = duration_ms
+            job.expires_at = job.finished_at + timedelta(seconds=self.ttl)
+            db.session.commit()
+
+            with self._lock:
+                self.running -= 1
+                self.durations.append(duration_ms)
+                if job.status == 'success':
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+            if job.status == 'success':
+                logs(f"Tâche {job_id} terminée", status='success', component='api', token=api_context.token, request_info=api_context.request.url, result=f"{duration_ms} ms", api_name=loaded_script.script_id, usage=usage)
+            else:
+                logs(f"Erreur lors de la tâche {job_id}: {job.error}", status='error', component='api', token=api_context.token, request_info=api_context.request.url, result=job.error, api_name=loaded_script.script_id)
+
+    def purge_expired(self, force=False):
+        # Au plus une purge par minute, déclenchée par les nouvelles tâches
+        now = time.monotonic()
+        if not force and now - self._last_purge < 60:
+            return 0
+
+        self._last_purge = now
+        deleted = ApiJob.query.filter(ApiJob.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    def stats(self):
+        durations = list(self.durations)
+        return {
+            "workers": self.workers,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_duration_ms": int(sum(durations) / len(durations)) if durations else None,
+            "max_duration_ms": max(durations) if durations else None,
+        }
+
+
+jobs = JobManager()
@@ -0,0 +1,47 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class VerifiedTokenCache:
+    """
+    Cookies d'administration déjà vérifiés (signature HS256): valeur du cookie -> payload décodé, jusqu'à son 'exp'.
+    La session reste contrôlée à chaque requête; seul le décodage du JWT est évité.
+    """
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict() # cookie -> payload
+        self._lock = threading.Lock()
+
+    def get(self, cookie):
+        with self._lock:
+            payload = self._entries.get(cookie)
+            if payload is not None and payload['exp'] > time.time():
+                self._entries.move_to_end(cookie)
+                self.hits += 1
+                return payload
+
+            if payload is not None:
+                del self._entries[cookie]
+            self.misses += 1
+
+        return None
+
+    def put(self, cookie, payload):
+        with self._lock:
+            self._entries[cookie] = payload
+            self._entries.move_to_end(cookie)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, cookie):
+        with self._lock:
+            self._entries.pop(cookie, None)
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+jwt_cache = VerifiedTokenCache()
@@ -0,0 +1,168 @@
+import sys
+import time
+import queue
+import atexit
+import random
+import threading
+from models.database import db
+
+
+OVERFLOW_POLICIES = ('block', 'drop', 'sample')
+
+
+class LogWriter:
+    """
+    Écriture des logs en base par lots depuis un thread dédié.
+    Les lignes sont mises en file (bornée) puis insérées en une transaction par lot, quand le lot est plein ou après flush_interval.
+    File pleine: 'block' attend une place, 'drop' abandonne la ligne, 'sample' n'en garde qu'une fraction (sample_rate) si une place s'est libérée.
+    Seul 'block' peut faire attendre le thread appelant; les lignes abandonnées sont comptées.
+    """
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.batch_size = 500
+        self.flush_interval = 1.0
+        self.overflow = 'block'
+        self.sample_rate = 0.1
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def configure(self, app, enable=True, queue_size=10000, batch_size=500, flush_interval=1.0, overflow='block', sample_rate=0.1):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Politique de débordement inconnue: {overflow}")
+
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.sample_rate = sample_rate
+
+        if not enable:
+            self.stop()
+            return
+
+        if self._thread is None:
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._thread = threading.Thread(target=self._run, name='iris-log-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+        self.enabled = True
+
+    def write(self, model, row):
+        """
+        Met une ligne en file. Renvoie False si l'écriture asynchrone est désactivée: l'appelant écrit alors lui-même.
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            self._queue.put_nowait((model, row))
+            return True
+        except queue.Full:
+            pass
+
+        if self.overflow == 'block':
+            self._queue.put((model, row))
+            return True
+
+        if self.overflow == 'sample' and random.random() < self.sample_rate:
+            # Nouvel essai sans attendre: le thread d'écriture a pu libérer une place entre-temps
+            try:
+                self._queue.put_nowait((model, row))
+                return True
+            except queue.Full:
+                pass
+
+        with self._lock:
+            self.dropped += 1
+
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch):
+        rows_by_table = {}
+        for model, row in batch:
+            rows_by_table.setdefault(model.__table__, []).append(row)
+
+        with self.app.app_context():
+            for table, rows in rows_by_table.items():
+                try:
+                    with db.engine.begin() as conn:
+                        conn.execute(table.insert(), rows)
+                    written = len(rows)
+                except Exception:
+                    # Une ligne invalide ne doit pas faire perdre tout le lot: nouvel essai ligne par ligne
+                    written = 0
+                    for row in rows:
+                        try:
+                            with db.engine.begin() as conn:
+                                conn.execute(table.insert(), row)
+                            written += 1
+                        except Exception as err:
+                            print(f"Erreur lors de l'écriture d'un log dans {table.name}: {err}", file=sys.stderr)
+
+                with self._lock:
+                    self.written += written
+                    self.failed += len(rows) - written
+
+        with self._lock:
+            self.flushes += 1
+
+    def stop(self, timeout=10):
+        """
+        Vide la file puis arrête le thread d'écriture. Les logs suivants sont écrits directement par l'appelant.
+        """
+        self.enabled = False
+        if self._thread is None:
+            return
+
+        # put bloquant: la file peut être pleine, le thread la vide avant de lire la fin
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+        if self.dropped:
+            print(f"{self.dropped} log(s) abandonné(s) car la file d'écriture était pleine", file=sys.stderr)
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+
+log_writer = LogWriter()
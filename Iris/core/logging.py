@@ -1,6 +1,7 @@
 from flask import request, has_request_context, has_app_context
 from models.database import db, LogSystem, LogWeb, LogApi
 from views.utils import construct_context
+from core.log_writer import log_writer
 from zpp_color import fg, attr
 from datetime import datetime
 import logging
@@ -14,7 +15,7 @@ def remove_ansi_codes(s: str) -> str:
     return ansi_escape.sub('', s)
 
 
-def logs(message, status, component, user_id=None, request_info=None, result=None, api_name=None, token=None):
+def logs(message, status, component, user_id=None, request_info=None, result=None, api_name=None, token=None, cache_hit=False, usage=None):
     if status=='logs':
         color = "light_gray"
     elif status=='info':
@@ -54,14 +55,20 @@ def logs(message, status, component, user_id=None, request_info=None, result=Non
     print(f"{print_date}{print_component}{fg('cyan')}{message}{attr(0)}")
 
     if has_app_context():
+        # Horodatage à l'appel: l'écriture en base peut être différée par log_writer
+        timestamp = datetime.utcnow()
         if component == 'system':
-            log_entry = LogSystem(
+            model = LogSystem
+            row = dict(
+                timestamp=timestamp,
                 level=status,
                 message=message,
                 details=result if result else '',
             )
         elif component == 'web':
-            log_entry = LogWeb(
+            model = LogWeb
+            row = dict(
+                timestamp=timestamp,
                 user_id=user_id,
                 ip_address=ip_address,
                 request=request_info,
@@ -69,20 +76,28 @@ def logs(message, status, component, user_id=None, request_info=None, result=Non
                 message=message
             )
         elif component == 'api':
-            log_entry = LogApi(
+            model = LogApi
+            row = dict(
+                timestamp=timestamp,
                 token=token, # In API logs, user_id is the token_id
                 ip_address=ip_address,
                 request=request_info,
                 status=status,
                 response=result if result else '',
                 message=message,
-                name=api_name
+                name=api_name,
+                cache_hit=cache_hit,
+                duration_ms=usage.wall_ms if usage else None,
+                cpu_ms=usage.cpu_ms if usage else None,
+                memory_peak=usage.memory_peak if usage else None,
+                result_size=usage.result_size if usage else None
             )
         else:
             return # Or raise an error for invalid component
 
-        db.session.add(log_entry)
-        db.session.commit()
+        if not log_writer.write(model, row):
+            db.session.add(model(**row))
+            db.session.commit()
 
 
 def flash_notification(message, status):
@@ -0,0 +1,148 @@
+import math
+import time
+import threading
+
+
+# Intervalle minimal entre deux suppressions des seaux inactifs (secondes)
+SWEEP_INTERVAL = 60
+
+
+class TokenBucket:
+    """
+    Seau à jetons: se remplit de 'rate' jetons par seconde jusqu'à 'capacity', un appel consomme un jeton.
+    Le débit et la capacité sont passés à chaque appel pour suivre les changements faits dans le panneau d'administration.
+    """
+    __slots__ = ('tokens', 'updated', 'full_at', 'lock')
+
+    def __init__(self, capacity):
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        # Instant où le seau sera de nouveau plein sans nouvel appel
+        self.full_at = self.updated
+        self.lock = threading.Lock()
+
+    def take(self, rate, capacity):
+        with self.lock:
+            now = time.monotonic()
+            tokens = min(capacity, self.tokens + (now - self.updated) * rate)
+            self.updated = now
+
+            allowed = tokens >= 1
+            self.tokens = tokens - 1 if allowed else tokens
+            self.full_at = now + (capacity - self.tokens) / rate
+            return allowed, self.tokens
+
+    def refund(self, capacity):
+        with self.lock:
+            self.tokens = min(capacity, self.tokens + 1)
+
+
+class RateLimitResult:
+    def __init__(self, allowed, limit, remaining, reset, retry_after=None):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.retry_after = retry_after
+
+    def apply(self, response):
+        response.headers['X-RateLimit-Limit'] = str(self.limit)
+        response.headers['X-RateLimit-Remaining'] = str(self.remaining)
+        response.headers['X-RateLimit-Reset'] = str(self.reset)
+        if self.retry_after is not None:
+            response.headers['Retry-After'] = str(self.retry_after)
+
+        return response
+
+
+def resolve_rate_limits(script_db, token=None):
+    """
+    Limites applicables à un appel: (clé du seau, requêtes par minute, rafale).
+    Par script, par token (appels authentifiés) et par couple token/script.
+    """
+    limits = []
+    if script_db.rate_limit:
+        limits.append((('script', script_db.id), script_db.rate_limit, script_db.rate_burst))
+
+    if token is not None:
+        if token.rate_limit:
+            limits.append((('token', token.id), token.rate_limit, token.rate_burst))
+        if script_db.token_rate_limit:
+            limits.append((('token_script', token.id, script_db.id), script_db.token_rate_limit, None))
+
+    return limits
+
+
+class RateLimiter:
+    """
+    Limitation de débit en mémoire par seaux à jetons.
+    Un verrou par seau, le verrou global n'est pris qu'à la création d'un seau.
+    Les seaux de nouveau pleins sont supprimés périodiquement: un seau plein équivaut à un seau neuf.
+    """
+    def __init__(self):
+        self._buckets = {}
+        self._rejected = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _bucket(self, key, capacity):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.setdefault(key, TokenBucket(capacity))
+
+        return bucket
+
+    def _sweep(self):
+        now = time.monotonic()
+        if now - self._last_sweep < SWEEP_INTERVAL:
+            return
+
+        with self._lock:
+            if now - self._last_sweep < SWEEP_INTERVAL:
+                return
+
+            self._last_sweep = now
+            # Inactifs depuis une période de remplissage complète: supprimés sans effet sur les limites
+            for key in [key for key, bucket in self._buckets.items() if bucket.full_at <= now]:
+                del self._buckets[key]
+
+    def check(self, script_id, limits):
+        """
+        Consomme un jeton dans chaque seau concerné. Renvoie None sans limite, sinon le RateLimitResult de la limite la plus restrictive.
+        """
+        if not limits:
+            return None
+
+        self._sweep()
+
+        taken = []
+        result = None
+        for key, per_minute, burst in limits:
+            rate = per_minute / 60
+            capacity = burst or per_minute
+            bucket = self._bucket(key, capacity)
+            allowed, tokens = bucket.take(rate, capacity)
+
+            if not allowed:
+                # Les jetons déjà pris dans les autres seaux sont rendus: un appel refusé ne compte pas
+                for taken_bucket, taken_capacity in taken:
+                    taken_bucket.refund(taken_capacity)
+
+                with self._lock:
+                    self._rejected[script_id] = self._rejected.get(script_id, 0) + 1
+
+                return RateLimitResult(False, capacity, 0, math.ceil((capacity - tokens) / rate), math.ceil((1 - tokens) / rate))
+
+            taken.append((bucket, capacity))
+            if result is None or int(tokens) < result.remaining:
+                result = RateLimitResult(True, capacity, int(tokens), math.ceil((capacity - tokens) / rate))
+
+        return result
+
+    def stats(self):
+        # Appels refusés par script
+        return dict(self._rejected)
+
+
+rate_limiter = RateLimiter()
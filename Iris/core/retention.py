@@ -0,0 +1,187 @@
+import os
+import gzip
+import time
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, func, text
+from models.database import db, LogSystem, LogWeb, LogApi, LogSocket
+from core.logging import logs
+from core.serializer import dumps
+
+
+LOG_MODELS = (LogSystem, LogWeb, LogApi, LogSocket)
+
+class RetentionPolicy:
+    def __init__(self, max_age_days=None, max_rows=None):
+        self.max_age_days = max_age_days
+        self.max_rows = max_rows
+
+
+class LogRetention:
+    """
+    Purge périodique des tables de logs selon leur politique (âge et nombre de lignes maximaux).
+    Les lignes sont supprimées par petits lots, chacun dans sa propre transaction, pour ne pas bloquer les écritures.
+    Les lignes purgées peuvent être archivées en JSONL compressé (gzip); l'espace libéré est rendu par VACUUM incrémental.
+    """
+    def __init__(self):
+        self.app = None
+        self.policies = {}
+        self.interval = 3600
+        self.batch_size = 1000
+        self.pause = 0.05
+        self.vacuum_pages = 1000
+        self.archive_dir = None
+        self.vacuum_convert = False
+        self.last_run = None
+        self.last_deleted = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._run_lock = threading.Lock()
+
+    def configure(self, app, enable=False, policies=None, interval=3600, batch_size=1000, pause=0.05, vacuum_pages=1000, archive_dir=None, vacuum_convert=False):
+        self.app = app
+        self.policies = policies or {}
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.vacuum_pages = vacuum_pages
+        self.archive_dir = archive_dir
+        self.vacuum_convert = vacuum_convert
+
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
+
+        if not enable:
+            self._stop.set()
+            return
+
+        self._enable_incremental_vacuum()
+
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='iris-log-retention', daemon=True)
+            self._thread.start()
+
+    def _enable_incremental_vacuum(self):
+        if self.vacuum_pages is None or db.engine.dialect.name != 'sqlite':
+            return
+
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            if conn.execute(text("PRAGMA auto_vacuum")).scalar() == 2:
+                return
+
+            size = conn.execute(text("PRAGMA page_count")).scalar() * conn.execute(text("PRAGMA page_size")).scalar()
+            if not self.vacuum_convert:
+                logs(f"VACUUM incrémental inactif: exécuter une fois 'PRAGMA auto_vacuum = INCREMENTAL; VACUUM;' sur la base ({size // (1024 * 1024)} MB) ou activer retention.vacuum_convert", status='warning', component='system')
+                return
+
+            # Le mode ne change qu'après un VACUUM complet, qui réécrit toute la base: uniquement sur demande explicite
+            logs(f"Conversion de la base ({size // (1024 * 1024)} MB) au VACUUM incrémental", status='info', component='system')
+            conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+            conn.execute(text("VACUUM"))
+
+        # Les connexions ouvertes avant la conversion gardent l'ancien mode en cache
+        db.engine.dispose()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run()
+            except Exception as err:
+                logs(f"Erreur lors de la purge des logs: {err}", status='error', component='system')
+
+    def run(self):
+        """
+        Applique les politiques de rétention à toutes les tables de logs. Renvoie le nombre de lignes supprimées par table.
+        """
+        with self._run_lock, self.app.app_context():
+            deleted = {}
+            for model in LOG_MODELS:
+                policy = self.policies.get(model.__tablename__)
+                if policy is None:
+                    continue
+
+                count = 0
+                if policy.max_age_days:
+                    count += self._prune(model.__table__, cutoff=datetime.utcnow() - timedelta(days=policy.max_age_days))
+                if policy.max_rows:
+                    with db.engine.connect() as conn:
+                        excess = conn.execute(select(func.count()).select_from(model.__table__)).scalar() - policy.max_rows
+                    if excess > 0:
+                        count += self._prune(model.__table__, limit=excess)
+
+                if count:
+                    deleted[model.__tablename__] = count
+
+            if deleted:
+                self._incremental_vacuum()
+                logs(f"Purge des logs: {', '.join(f'{name} {count}' for name, count in deleted.items())} ligne(s) supprimée(s)", status='info', component='system')
+
+            self.last_run = datetime.utcnow()
+            self.last_deleted = deleted
+            return deleted
+
+    def _prune(self, table, cutoff=None, limit=None):
+        """
+        Supprime les lignes les plus anciennes (ordre des ids), par lots: plus anciennes que cutoff, ou les 'limit' premières.
+        """
+        archive = None
+        deleted = 0
+        # Sans archive, seuls l'id et la date sont lus
+        columns = [table] if self.archive_dir else [table.c.id, table.c.timestamp]
+        try:
+            while limit is None or deleted < limit:
+                size = self.batch_size if limit is None else min(self.batch_size, limit - deleted)
+                with db.engine.begin() as conn:
+                    rows = conn.execute(select(*columns).order_by(table.c.id).limit(size)).mappings().all()
+                    if cutoff is not None:
+                        # Les ids suivent l'ordre d'écriture: le premier log récent termine la purge
+                        expired = []
+                        for row in rows:
+                            if row['timestamp'] >= cutoff:
+                                break
+                            expired.append(row)
+                        rows = expired
+
+                    if not rows:
+                        break
+
+                    if self.archive_dir:
+                        if archive is None:
+                            name = f"{table.name}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.jsonl.gz"
+                            archive = gzip.open(os.path.join(self.archive_dir, name), 'ab')
+                        archive.writelines(dumps(dict(row)) + b'\n' for row in rows)
+                        archive.flush()
+
+                    conn.execute(delete(table).where(table.c.id <= rows[-1]['id']))
+
+                deleted += len(rows)
+                if len(rows) < size:
+                    break
+
+                # Laisse passer les écritures en attente entre deux lots
+                time.sleep(self.pause)
+        finally:
+            if archive is not None:
+                archive.close()
+
+        return deleted
+
+    def _incremental_vacuum(self):
+        if self.vacuum_pages is None or db.engine.dialect.name != 'sqlite':
+            return
+
+        connection = db.engine.raw_connection()
+        try:
+            sqlite_connection = connection.driver_connection
+            if sqlite_connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                # execute() ne libère qu'une page par appel: executescript exécute le pragma jusqu'au bout (0 = toutes les pages libres)
+                sqlite_connection.executescript(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)});")
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stop.set()
+
+
+log_retention = LogRetention()
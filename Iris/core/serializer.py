@@ -0,0 +1,97 @@
+import json
+import uuid
+import decimal
+import datetime
+import dataclasses
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+JSON_BACKENDS = ('auto', 'orjson', 'json')
+
+
+def default(obj):
+    """
+    Types non natifs du module json: dates, Decimal, UUID, dataclass, ensembles et types NumPy.
+    """
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        # Chaîne plutôt que float: la précision est conservée
+        return str(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if numpy is not None:
+        if isinstance(obj, numpy.ndarray):
+            return obj.tolist()
+        if isinstance(obj, numpy.generic):
+            return obj.item()
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JsonSerializer:
+    """
+    Encodage JSON des résultats d'API en bytes.
+    orjson est utilisé s'il est installé, sinon le module json standard; les deux produisent le même JSON compact.
+    Les clés sont triées par défaut, comme le faisait jsonify: le corps (et donc l'ETag) ne dépend pas de l'ordre d'insertion du dict.
+    Le même encodage sert à la réponse HTTP, au cache et au log.
+    """
+    def __init__(self):
+        self.sort_keys = True
+        self.backend = None
+        self.configure()
+
+    def configure(self, backend='auto', sort_keys=True):
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"Sérialiseur JSON inconnu: {backend}")
+
+        if backend == 'orjson' and orjson is None:
+            raise ValueError("orjson n'est pas installé")
+
+        self.backend = 'orjson' if backend != 'json' and orjson is not None else 'json'
+        self.sort_keys = sort_keys
+
+        if self.backend == 'orjson':
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            self._option = option
+
+    def dumps(self, obj):
+        if self.backend == 'orjson':
+            try:
+                return orjson.dumps(obj, default=default, option=self._option)
+            except (orjson.JSONEncodeError, TypeError):
+                # Entiers au-delà de 64 bits, clés non supportées...: le module standard prend le relais
+                pass
+
+        try:
+            return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':'), sort_keys=self.sort_keys).encode('utf-8')
+        except TypeError:
+            if not self.sort_keys:
+                raise
+
+            # Clés de types différents (int et str...): impossibles à trier, encodées dans l'ordre du dict
+            return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+serializer = JsonSerializer()
+
+
+def dumps(obj):
+    return serializer.dumps(obj)
@@ -0,0 +1,196 @@
+import time
+import sqlite3
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class SessionStore(ABC):
+    """
+    Stockage des sessions de l'administration: jeton de session -> utilisateur, rôle et date d'expiration (timestamp).
+    """
+    @abstractmethod
+    def put(self, token, user_id, role, expires_at):
+        pass
+
+    @abstractmethod
+    def get(self, token):
+        # {"user_id": ..., "role": ...} ou None si la session est inconnue, expirée ou révoquée
+        pass
+
+    @abstractmethod
+    def revoke(self, token):
+        pass
+
+    @abstractmethod
+    def sweep(self):
+        # Supprime les sessions expirées et renvoie leur nombre
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Sessions en mémoire du processus, bornées en nombre (la moins récemment utilisée est supprimée).
+    """
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # token -> (expires_at, session)
+        self._lock = threading.Lock()
+
+    def put(self, token, user_id, role, expires_at):
+        with self._lock:
+            self._entries[token] = (expires_at, {"user_id": user_id, "role": role})
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, token):
+        with self._lock:
+            item = self._entries.get(token)
+            if item is None:
+                return None
+
+            if item[0] <= time.time():
+                del self._entries[token]
+                return None
+
+            self._entries.move_to_end(token)
+            return item[1]
+
+    def revoke(self, token):
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def sweep(self):
+        now = time.time()
+        with self._lock:
+            expired = [token for token, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for token in expired:
+                del self._entries[token]
+
+        return len(expired)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    Sessions dans un fichier SQLite (mode WAL) partagé par les processus du serveur.
+    Seule l'empreinte SHA-256 du jeton est stockée; une connexion par thread.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS iris_session (digest TEXT PRIMARY KEY, user_id INTEGER NOT NULL, role TEXT, expires_at REAL NOT NULL) WITHOUT ROWID")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_iris_session_expires_at ON iris_session (expires_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+
+        return conn
+
+    @staticmethod
+    def _digest(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def put(self, token, user_id, role, expires_at):
+        self._connect().execute("INSERT OR REPLACE INTO iris_session (digest, user_id, role, expires_at) VALUES (?, ?, ?, ?)", (self._digest(token), user_id, role, expires_at))
+
+    def get(self, token):
+        row = self._connect().execute("SELECT user_id, role FROM iris_session WHERE digest = ? AND expires_at > ?", (self._digest(token), time.time())).fetchone()
+        if row is None:
+            return None
+
+        return {"user_id": row[0], "role": row[1]}
+
+    def revoke(self, token):
+        self._connect().execute("DELETE FROM iris_session WHERE digest = ?", (self._digest(token),))
+
+    def sweep(self):
+        return self._connect().execute("DELETE FROM iris_session WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM iris_session").fetchone()[0]
+
+
+SESSION_BACKENDS = ('memory', 'sqlite')
+
+
+class SessionManager:
+    """
+    Point d'accès aux sessions de l'administration: backend configuré et purge des sessions expirées en tâche de fond.
+    """
+    def __init__(self):
+        self.store = MemorySessionStore()
+        self.backend = 'memory'
+        self.ttl = 3600 * 60
+        self.sweep_interval = 300
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def configure(self, backend='memory', path=None, ttl=3600 * 60, max_entries=10000, sweep_interval=300):
+        if backend not in SESSION_BACKENDS:
+            raise ValueError(f"Stockage de sessions inconnu: {backend}")
+
+        self.backend = backend
+        self.store = SqliteSessionStore(path) if backend == 'sqlite' else MemorySessionStore(max_entries)
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.start_sweeper()
+
+    def create(self, token, user_id, role):
+        expires_at = time.time() + self.ttl
+        self.store.put(token, user_id, role, expires_at)
+        return expires_at
+
+    def get(self, token):
+        return self.store.get(token)
+
+    def revoke(self, token):
+        self.store.revoke(token)
+
+    def start_sweeper(self):
+        if self._thread is not None and self._thread.is_alive():
+            # Le thread déjà lancé reprend son attente avec le nouvel intervalle
+            self._wakeup.set()
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sweep_loop, name='iris-session-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def _sweep_loop(self):
+        while not self._stop.is_set():
+            if self._wakeup.wait(self.sweep_interval):
+                self._wakeup.clear()
+                continue
+
+            try:
+                self.store.sweep()
+            except sqlite3.Error:
+                # Base verrouillée par un autre processus: la purge sera refaite au prochain passage
+                pass
+
+    def stats(self):
+        return {"backend": self.backend, "sessions": len(self.store)}
+
+
+sessions = SessionManager()
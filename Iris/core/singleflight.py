@@ -0,0 +1,117 @@
+import threading
+
+
+class CoalesceTimeout(Exception):
+    """
+    Le résultat de l'exécution partagée n'est pas arrivé dans le délai imparti.
+    """
+
+
+class Flight:
+    """
+    Exécution en cours partagée par des appels identiques: le premier appel (leader) exécute le script, les suivants attendent son résultat.
+    """
+    def __init__(self, script_id, key):
+        self.script_id = script_id
+        self.key = key
+        self.body = None
+        self.etag = None
+        self.error = None
+        self.followers = 0
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+
+class _FlightStats:
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+
+class SingleFlight:
+    """
+    Regroupement des appels identiques simultanés (même script, mêmes arguments convertis, même token).
+    Le résultat encodé du leader est transmis tel quel aux appels en attente.
+    """
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+        self._flights = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _script_stats(self, script_id):
+        stats = self._stats.get(script_id)
+        if stats is None:
+            stats = self._stats[script_id] = _FlightStats()
+
+        return stats
+
+    def join(self, script_id, key):
+        """
+        Renvoie (flight, leader): leader est vrai si l'appel doit exécuter le script.
+        """
+        with self._lock:
+            flight = self._flights.get((script_id, key))
+            if flight is not None:
+                flight.followers += 1
+                return flight, False
+
+            flight = self._flights[(script_id, key)] = Flight(script_id, key)
+            self._script_stats(script_id).executions += 1
+            return flight, True
+
+    def wait(self, flight, timeout=None):
+        if not flight._done.wait(timeout or self.timeout):
+            with self._lock:
+                self._script_stats(flight.script_id).timeouts += 1
+            raise CoalesceTimeout(f"Résultat partagé de {flight.script_id} non reçu après {timeout or self.timeout} secondes")
+
+        if flight.body is not None or flight.error is not None:
+            with self._lock:
+                self._script_stats(flight.script_id).coalesced += 1
+
+        return flight
+
+    def complete(self, flight, body=None, etag=None, error=None):
+        """
+        Publie le résultat du leader. Sans corps ni erreur, les appels en attente exécutent le script eux-mêmes.
+        """
+        if flight.done:
+            return
+
+        flight.body = body
+        flight.etag = etag
+        flight.error = error
+
+        # Retiré avant le réveil: un nouvel appel identique relance une exécution
+        with self._lock:
+            if self._flights.get((flight.script_id, flight.key)) is flight:
+                del self._flights[(flight.script_id, flight.key)]
+        flight._done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                script_id: {
+                    "executions": stats.executions,
+                    "coalesced": stats.coalesced,
+                    "timeouts": stats.timeouts,
+                    "in_flight": sum(1 for flight_script_id, key in self._flights if flight_script_id == script_id),
+                }
+                for script_id, stats in self._stats.items()
+            }
+
+
+single_flight = SingleFlight()
+
+
+def resolve_coalesce(script_db, loaded_script):
+    """
+    Regroupement des appels identiques: réglage de la ligne ApiScript, sinon option de @entrypoint.
+    """
+    options = getattr(loaded_script.entrypoint, '_entrypoint_options', {})
+    return bool(script_db.coalesce or options.get('coalesce', False))
@@ -0,0 +1,153 @@
+import time
+import inspect
+from collections.abc import Iterator
+from flask import current_app, stream_with_context
+from core.environment_manager import EnvironmentContext
+from core.executor import run_coroutine, ExecutionTimeout
+from core.logging import logs
+from core.accounting import measure
+from core.serializer import dumps
+
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+# Les éléments encodés sont regroupés jusqu'à cette taille avant d'être envoyés
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def is_stream_function(func):
+    return inspect.isgeneratorfunction(func) or inspect.isasyncgenfunction(func)
+
+
+def is_stream_result(result):
+    # Listes, dict et chaînes restent une réponse JSON classique; générateurs et itérateurs sont envoyés en flux
+    return isinstance(result, Iterator) or inspect.isasyncgen(result)
+
+
+def resolve_stream_format(loaded_script, accept_mimetypes):
+    """
+    Format du flux: celui demandé par l'en-tête Accept, sinon celui de @entrypoint(stream_format=...), sinon NDJSON.
+    """
+    options = getattr(loaded_script.entrypoint, '_entrypoint_options', {})
+    default = options.get('stream_format', 'ndjson')
+    if default not in STREAM_FORMATS:
+        raise ValueError(f"Format de flux inconnu pour {loaded_script.script_id}: {default}")
+
+    mimetypes = [STREAM_FORMATS[default]] + [mimetype for mimetype in STREAM_FORMATS.values() if mimetype != STREAM_FORMATS[default]]
+    best = accept_mimetypes.best_match(mimetypes, default=STREAM_FORMATS[default])
+    return next(name for name, mimetype in STREAM_FORMATS.items() if mimetype == best)
+
+
+def iter_stream(result, api_context, usage=None, timeout=None):
+    """
+    Éléments d'un générateur ou itérateur de script. Le contexte est posé à chaque reprise: il reste actif pendant toute la vie du flux.
+    Chaque reprise est mesurée et ajoutée à usage: le temps passé à envoyer les éléments au client n'est pas compté.
+    Au-delà de timeout secondes passées dans le générateur, le flux est fermé avant la reprise suivante (ExecutionTimeout).
+    """
+    is_async = inspect.isasyncgen(result)
+    elapsed = 0
+    try:
+        while True:
+            if timeout and elapsed >= timeout:
+                raise ExecutionTimeout(f"Délai d'exécution dépassé ({timeout}s)")
+
+            start = time.perf_counter()
+            try:
+                if is_async:
+                    with measure(usage, cpu=False, accumulate=True):
+                        item = run_coroutine(result.__anext__(), api_context)
+                else:
+                    with EnvironmentContext(api_context), measure(usage, accumulate=True):
+                        item = next(result)
+            except (StopIteration, StopAsyncIteration):
+                return
+
+            elapsed += time.perf_counter() - start
+            yield item
+    finally:
+        if is_async:
+            run_coroutine(result.aclose(), api_context)
+        else:
+            close = getattr(result, 'close', None)
+            if close:
+                with EnvironmentContext(api_context):
+                    close()
+
+
+def _encode(result, api_context, stream_format, log_info, usage=None, timeout=None, on_timeout=None):
+    separator = b'\n' if stream_format == 'ndjson' else b','
+
+    count = 0
+    chunk = [] if stream_format == 'ndjson' else [b'[']
+    size = len(chunk)
+    sent = 0
+    items = iter_stream(result, api_context, usage, timeout)
+    try:
+        for item in items:
+            encoded = dumps(item)
+            if stream_format == 'ndjson':
+                chunk.append(encoded + separator)
+            else:
+                chunk.append(encoded if count == 0 else separator + encoded)
+
+            count += 1
+            size += len(chunk[-1])
+            if size >= STREAM_CHUNK_SIZE:
+                yield b''.join(chunk)
+                sent += size
+                chunk = []
+                size = 0
+
+    except GeneratorExit:
+        if usage:
+            usage.result_size = sent
+        logs(f"Flux interrompu par le client", status='warning', component='api', result=f"{count} éléments envoyés ({stream_format})", usage=usage, **log_info)
+        raise
+    except Exception as err:
+        # Le statut HTTP est déjà envoyé: l'erreur est signalée comme dernier élément du flux
+        timed_out = isinstance(err, ExecutionTimeout)
+        error = dumps({"error": "Délai d'exécution dépassé" if timed_out else "Erreur pendant l'envoi du flux"})
+        if stream_format == 'ndjson':
+            chunk.append(error + separator)
+        else:
+            chunk.append(error if count == 0 else separator + error)
+
+        if timed_out:
+            if on_timeout:
+                on_timeout()
+            if usage:
+                usage.result_size = sent + size + len(chunk[-1]) + (1 if stream_format == 'json' else 0)
+            logs(f"Délai d'exécution dépassé (flux)", status='error', component='api', result=str(err), usage=usage, **log_info)
+        else:
+            logs(f"Erreur pendant l'envoi du flux: {err}", status='error', component='api', result=str(err), **log_info)
+    else:
+        if usage:
+            # Octets envoyés, fin du tableau JSON comprise
+            usage.result_size = sent + size + (1 if stream_format == 'json' else 0)
+        logs(f"Accès à l'api réussi (flux)", status='success', component='api', result=f"{count} éléments envoyés ({stream_format})", usage=usage, **log_info)
+    finally:
+        # Fermeture explicite: le générateur du script est libéré même si le client se déconnecte
+        items.close()
+
+    if stream_format == 'json':
+        chunk.append(b']')
+
+    yield b''.join(chunk)
+
+
+def stream_response(result, api_context, stream_format, log_info, on_close=None, usage=None, timeout=None, on_timeout=None):
+    """
+    Réponse Flask envoyée au fil de l'eau à partir d'un générateur ou itérateur.
+    Mémoire constante par requête: un élément est encodé puis envoyé sans construire la liste complète.
+    on_close est appelé à la fermeture de la réponse, y compris si le client se déconnecte.
+    usage (ResourceUsage) reçoit le temps passé dans le générateur et le nombre d'octets envoyés, enregistrés avec le log de fin du flux.
+    timeout borne le temps passé dans le générateur: le flux se termine par une erreur et on_timeout est appelé.
+    """
+    response = current_app.response_class(stream_with_context(_encode(result, api_context, stream_format, log_info, usage, timeout, on_timeout)), mimetype=STREAM_FORMATS[stream_format])
+    if on_close:
+        response.call_on_close(on_close)
+
+    return response
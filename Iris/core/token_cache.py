@@ -0,0 +1,114 @@
+import time
+import threading
+from collections import OrderedDict
+from models.database import db, ApiToken, token_api_association
+
+
+class CachedToken:
+    """
+    Copie en mémoire d'un ApiToken, détachée de la session: état, type, variables d'environnement, limites et scripts autorisés.
+    """
+    __slots__ = ('id', 'token', 'is_active', 'token_type', 'environment_vars', 'rate_limit', 'rate_burst', 'script_ids')
+
+    def __init__(self, token, script_ids):
+        self.id = token.id
+        self.token = token.token
+        self.is_active = token.is_active
+        self.token_type = token.token_type
+        self.environment_vars = dict(token.environment_vars) if token.environment_vars else None
+        self.rate_limit = token.rate_limit
+        self.rate_burst = token.rate_burst
+        self.script_ids = frozenset(script_ids)
+
+
+class TokenCache:
+    """
+    Cache LRU des tokens d'API, indexé par la chaîne du token.
+    Les tokens inconnus sont gardés à part, peu de temps et en nombre limité, pour qu'un balayage de tokens aléatoires n'évince pas les tokens valides.
+    Invalidé par les routes d'administration des tokens; la durée de vie borne le décalage entre plusieurs processus.
+    """
+    def __init__(self, ttl=60, max_entries=10000, negative_ttl=5, max_negative=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self.max_negative = max_negative
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict() # token_str -> (expires_at, CachedToken)
+        self._unknown = OrderedDict() # token_str -> expires_at
+        # Génération par token et globale: un chargement commencé avant une invalidation n'est pas mis en cache
+        self._generation = 0
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def configure(self, ttl=60, max_entries=10000, negative_ttl=5, max_negative=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self.max_negative = max_negative
+        self.invalidate()
+
+    def _load(self, token_str):
+        token = ApiToken.query.filter_by(token=token_str).first()
+        if token is None:
+            return None
+
+        # Ids des scripts lus directement dans la table d'association, sans charger les ApiScript
+        script_ids = [row[0] for row in db.session.query(token_api_association.c.script_id).filter(token_api_association.c.token_id == token.id)]
+        return CachedToken(token, script_ids)
+
+    def get(self, token_str):
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(token_str)
+            if item is not None and item[0] > now:
+                self._entries.move_to_end(token_str)
+                self.hits += 1
+                return item[1]
+
+            expires_at = self._unknown.get(token_str)
+            if expires_at is not None and expires_at > now:
+                self.hits += 1
+                return None
+
+            self.misses += 1
+            generation = (self._generation, self._generations.get(token_str, 0))
+
+        cached = self._load(token_str)
+
+        with self._lock:
+            if generation != (self._generation, self._generations.get(token_str, 0)):
+                # Invalidé pendant le chargement: l'état lu est peut-être antérieur à la modification
+                return cached
+
+            if cached is None:
+                self._unknown[token_str] = now + self.negative_ttl
+                self._unknown.move_to_end(token_str)
+                while len(self._unknown) > self.max_negative:
+                    self._unknown.popitem(last=False)
+            else:
+                self._unknown.pop(token_str, None)
+                self._entries[token_str] = (now + self.ttl, cached)
+                self._entries.move_to_end(token_str)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return cached
+
+    def invalidate(self, token_str=None):
+        with self._lock:
+            if token_str is None:
+                self._entries.clear()
+                self._unknown.clear()
+                self._generations.clear()
+                self._generation += 1
+            else:
+                self._entries.pop(token_str, None)
+                self._unknown.pop(token_str, None)
+                self._generations[token_str] = self._generations.get(token_str, 0) + 1
+
+    def stats(self):
+        return {"entries": len(self._entries), "unknown": len(self._unknown), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache()
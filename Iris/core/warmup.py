@@ -0,0 +1,65 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from models.database import db, ApiScript
+from core.logging import logs
+from core.fabric import registry
+
+
+class WarmUp:
+    """
+    Préchargement en parallèle des scripts en ligne au démarrage.
+    Le processus n'est déclaré prêt qu'une fois tous les scripts chargés (ou en échec).
+    """
+    def __init__(self):
+        self.ready = False
+        self.results = {} # script_id -> {"duration_ms": ..., "error": ...}
+        self.duration_ms = None
+
+    def _load(self, script_id, script_path):
+        start = time.perf_counter()
+        try:
+            loaded_script = registry.get(script_id, script_path)
+            error = None if loaded_script.entrypoint else "Aucun @entrypoint trouvé"
+        except Exception as err:
+            error = f"{type(err).__name__}: {err}"
+
+        return script_id, int((time.perf_counter() - start) * 1000), error
+
+    def run(self, app, fabric_dir, workers=8):
+        with app.app_context():
+            start = time.perf_counter()
+            self.ready = False
+            self.results = {}
+            scripts = [(script.id, os.path.join(fabric_dir, script.path)) for script in ApiScript.query.filter_by(is_online=True).all() if script.path]
+
+            with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='iris-warmup') as pool:
+                results = list(pool.map(lambda script: self._load(*script), scripts))
+
+            # Écritures en base et logs dans le thread appelant: la session n'est pas partagée entre threads
+            failures = 0
+            for script_id, duration_ms, error in results:
+                self.results[script_id] = {"duration_ms": duration_ms, "error": error}
+                script_obj = db.session.get(ApiScript, script_id)
+                script_obj.load_error = error
+
+                if error:
+                    failures += 1
+                    logs(f"Échec du préchargement de {script_id}: {error}", status='error', component='system', result={"duration_ms": duration_ms})
+                else:
+                    logs(f"Préchargement de {script_id} en {duration_ms} ms", status='info', component='system', result={"duration_ms": duration_ms})
+            db.session.commit()
+
+            self.duration_ms = int((time.perf_counter() - start) * 1000)
+            logs(f"Préchargement terminé: {len(results) - failures}/{len(results)} scripts en {self.duration_ms} ms", status='success' if not failures else 'warning', component='system')
+            self.ready = True
+
+    def start(self, app, fabric_dir, workers=8, wait=True):
+        if wait:
+            self.run(app, fabric_dir, workers)
+        else:
+            threading.Thread(target=self.run, args=(app, fabric_dir, workers), name='iris-warmup', daemon=True).start()
+
+
+warmup = WarmUp()
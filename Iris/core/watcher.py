@@ -0,0 +1,228 @@
+import os
+import time
+import threading
+from pathlib import Path
+from models.database import db, ApiScript
+from core.logging import logs
+from core.fabric import registry, refresh_db
+from core.cache import result_cache
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+
+WATCH_BACKENDS = ('auto', 'watchdog', 'polling')
+
+# watchdog émet aussi 'opened' et 'closed_no_write' quand un fichier est seulement lu:
+# le rechargement du script le relit, ce qui relancerait une synchronisation sans fin
+SYNC_EVENTS = ('created', 'modified', 'deleted', 'moved')
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in SYNC_EVENTS:
+            return
+
+        self.watcher.notify(event.src_path)
+        # Renommage: l'ancien et le nouveau chemin sont tous deux à synchroniser
+        dest_path = getattr(event, 'dest_path', None)
+        if dest_path:
+            self.watcher.notify(dest_path)
+
+
+class FabricWatcher:
+    """
+    Synchronisation en tâche de fond du dossier fabric avec la table ApiScript.
+    Surveillance par inotify (watchdog) si disponible, sinon par scrutation périodique du dossier.
+    Seuls les scripts modifiés sont rechargés et mis à jour dans la base.
+    """
+    def __init__(self):
+        self.app = None
+        self.fabric_dir = None
+        self.backend = None
+        self.running = False
+        self.last_sync = None
+        self._pending = set()
+        self._file_states = {} # chemin -> (mtime_ns, taille) lors de la dernière synchronisation
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._observer = None
+
+    def start(self, app, fabric_dir, backend='auto', interval=2.0, debounce=0.5):
+        if self.running:
+            return
+
+        if backend not in WATCH_BACKENDS:
+            raise ValueError(f"Mode de surveillance inconnu: {backend}")
+
+        self.app = app
+        self.fabric_dir = fabric_dir
+        self.interval = interval
+        self.debounce = debounce
+
+        # Synchronisation complète au démarrage, puis uniquement les fichiers modifiés
+        refresh_db(fabric_dir)
+        self._file_states = self._snapshot()
+        self.last_sync = time.time()
+
+        if backend != 'polling' and Observer is not None:
+            self.backend = 'watchdog'
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), os.path.abspath(fabric_dir), recursive=True)
+            self._observer.daemon = True
+            self._observer.start()
+            target = self._watch_loop
+        else:
+            if backend == 'watchdog':
+                logs(f"watchdog n'est pas installé: surveillance du dossier fabric par scrutation", status='warning', component='system')
+            self.backend = 'polling'
+            target = self._poll_loop
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=target, name='iris-fabric-watcher', daemon=True)
+        self._thread.start()
+        self.running = True
+
+        logs(f"Surveillance du dossier fabric démarrée ({self.backend})", status='info', component='system')
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        self.running = False
+
+    def notify(self, path):
+        with self._pending_lock:
+            self._pending.add(os.path.abspath(path))
+        self._wakeup.set()
+
+    def _watch_loop(self):
+        while not self._stop.is_set():
+            self._wakeup.wait()
+            if self._stop.is_set():
+                return
+
+            # Regroupe les écritures successives d'un éditeur en une seule synchronisation
+            time.sleep(self.debounce)
+            self._wakeup.clear()
+            with self._pending_lock:
+                paths, self._pending = self._pending, set()
+
+            self.sync(paths)
+
+    def _snapshot(self):
+        snapshot = {}
+        for root, dirs, files in os.walk(self.fabric_dir):
+            dirs[:] = [name for name in dirs if name != '__pycache__']
+            for name in files:
+                if name.endswith('.py'):
+                    path = os.path.abspath(os.path.join(root, name))
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+
+        return snapshot
+
+    def _poll_loop(self):
+        previous = self._snapshot()
+        while not self._stop.wait(self.interval):
+            current = self._snapshot()
+            changed = {path for path, state in current.items() if previous.get(path) != state}
+            removed = previous.keys() - current.keys()
+            previous = current
+
+            if changed or removed:
+                self.sync(changed | removed)
+
+    def sync(self, paths):
+        """
+        Met à jour ApiScript pour les fichiers donnés uniquement (ajout, modification, suppression).
+        """
+        fabric_path = os.path.abspath(self.fabric_dir)
+
+        with self.app.app_context():
+            for path in sorted(paths):
+                try:
+                    self._sync_path(fabric_path, path)
+                    db.session.commit()
+                except Exception as err:
+                    db.session.rollback()
+                    logs(f"Erreur lors de la synchronisation de {path}: {err}", status='error', component='system', result=str(err))
+
+        self.last_sync = time.time()
+
+    def _sync_path(self, fabric_path, path):
+        file_path = Path(path)
+        if file_path.suffix != '.py' or file_path.name == 'core.py' or '__pycache__' in file_path.parts:
+            return
+
+        script_path_rel = os.path.relpath(path, fabric_path)
+        if script_path_rel.startswith('..'):
+            return
+
+        # Fichier identique à la dernière synchronisation (événement sans écriture): rien à recharger
+        try:
+            stat = os.stat(path)
+            state = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            state = None
+        if state is not None and self._file_states.get(os.path.abspath(path)) == state:
+            return
+
+        if state is None:
+            self._file_states.pop(os.path.abspath(path), None)
+        else:
+            self._file_states[os.path.abspath(path)] = state
+
+        script_id = file_path.stem
+        script_obj = db.session.get(ApiScript, script_id)
+
+        # État du script en mémoire invalidé pour ce seul script
+        registry.invalidate(script_id)
+        result_cache.purge(script_id)
+
+        if not os.path.isfile(path):
+            if script_obj and script_obj.path == script_path_rel:
+                db.session.delete(script_obj)
+                logs(f"api {script_id} supprimée de la base", status='info', component='system')
+            return
+
+        try:
+            loaded_script = registry.get(script_id, os.path.join(self.fabric_dir, script_path_rel))
+        except Exception as err:
+            # La ligne en base est conservée: une erreur de syntaxe pendant l'édition ne fait pas perdre la configuration
+            logs(f"Error loading script {script_id} from {path}: {err}", status='error', component='system')
+            if script_obj and script_obj.path == script_path_rel:
+                script_obj.load_error = f"{type(err).__name__}: {err}"
+            return
+
+        if loaded_script.entrypoint is None:
+            if script_obj and script_obj.path == script_path_rel:
+                db.session.delete(script_obj)
+                logs(f"Script {script_id} ignored: no entrypoint decorator found.", status='info', component='system')
+            return
+
+        if script_obj is None:
+            db.session.add(ApiScript(id=script_id, path=script_path_rel, is_online=False))
+            logs(f"api {script_id} ajouté dans la base", status='info', component='system')
+        else:
+            script_obj.load_error = None
+            if script_obj.path != script_path_rel:
+                script_obj.path = script_path_rel
+                logs(f"api {script_id} mise à jour dans la base", status='info', component='system')
+
+
+fabric_watcher = FabricWatcher()
@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
 import uuid
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
@@ -47,6 +48,19 @@ class ApiScript(db.Model):
     is_public = db.Column(db.Boolean, default=True, nullable=False)
     is_online = db.Column(db.Boolean, default=False, nullable=False) # Changé à False
     environment_vars = db.Column(db.JSON, nullable=True) # New field for script-specific environment variables
+    executor = db.Column(db.String(20), nullable=True) # 'thread', 'process' ou None pour suivre le décorateur @entrypoint
+    max_concurrency = db.Column(db.Integer, nullable=True) # Nombre maximal d'exécutions simultanées (None = illimité)
+    timeout = db.Column(db.Float, nullable=True) # Délai d'exécution maximal en secondes (None = illimité)
+    cache_ttl = db.Column(db.Float, nullable=True) # Durée de vie des résultats en cache, en secondes (None = suivre @entrypoint)
+    cache_max_entries = db.Column(db.Integer, nullable=True) # Nombre maximal de résultats en cache
+    cache_per_token = db.Column(db.Boolean, default=False, nullable=False, server_default='0') # Clé de cache distincte par token
+    rate_limit = db.Column(db.Integer, nullable=True) # Nombre maximal d'appels par minute, tous tokens confondus (None = illimité)
+    rate_burst = db.Column(db.Integer, nullable=True) # Rafale autorisée au-delà du débit (None = rate_limit)
+    token_rate_limit = db.Column(db.Integer, nullable=True) # Nombre maximal d'appels par minute et par token
+    coalesce = db.Column(db.Boolean, default=False, nullable=False, server_default='0') # Exécution partagée entre appels identiques simultanés
+    cache_control = db.Column(db.String(200), nullable=True) # En-tête Cache-Control des réponses (None = suivre @entrypoint)
+    compress = db.Column(db.Boolean, nullable=True) # Compression des réponses (None = suivre @entrypoint, activée par défaut)
+    load_error = db.Column(db.Text, nullable=True) # Dernière erreur de chargement du script (préchargement, synchronisation du dossier fabric)
 
     # Relationship for tokens that can access this script
     tokens_with_access = db.relationship('ApiToken', secondary=token_api_association, lazy='subquery',
@@ -61,6 +75,37 @@ class ApiToken(db.Model):
     token_type = db.Column(db.String(20), nullable=False, default='app') # 'universal' or 'app'
     creator_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False) # Link to the user who created it
     environment_vars = db.Column(db.JSON, nullable=True) # New field for token-specific environment variables
+    rate_limit = db.Column(db.Integer, nullable=True) # Nombre maximal d'appels par minute, tous scripts confondus (None = illimité)
+    rate_burst = db.Column(db.Integer, nullable=True) # Rafale autorisée au-delà du débit (None = rate_limit)
+
+class ApiJob(db.Model):
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    script_id = db.Column(db.String(100), nullable=False, index=True)
+    token = db.Column(db.String(128), nullable=True) # Token de l'appelant: seul ce token peut lire le résultat
+    status = db.Column(db.String(20), nullable=False, default='queued') # 'queued', 'running', 'success', 'error' ou 'timeout'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    duration_ms = db.Column(db.Integer, nullable=True)
+    result = db.Column(db.Text, nullable=True) # Résultat encodé en JSON
+    error = db.Column(db.Text, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "script": self.script_id,
+            "status": self.status,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_ms": self.duration_ms,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "error": self.error,
+        }
+
+    def __repr__(self):
+        return f'<ApiJob {self.id} - {self.status}>'
 
 class LogSystem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -96,6 +141,11 @@ class LogApi(db.Model):
     status = db.Column(db.String(20))
     response = db.Column(db.Text)
     message = db.Column(db.Text)
+    cache_hit = db.Column(db.Boolean, default=False, nullable=False, server_default='0') # Réponse servie depuis le cache
+    duration_ms = db.Column(db.Float, nullable=True) # Durée d'exécution du point d'entrée
+    cpu_ms = db.Column(db.Float, nullable=True) # Temps CPU du thread pendant l'exécution (None pour les coroutines)
+    memory_peak = db.Column(db.Integer, nullable=True) # Pic de mémoire allouée en octets (appels échantillonnés uniquement)
+    result_size = db.Column(db.Integer, nullable=True) # Taille du résultat encodé en octets
 
     def __repr__(self):
         return f'<LogApi {self.id} - {self.status}>'
@@ -113,7 +163,28 @@ class LogSocket(db.Model):
     def __repr__(self):
         return f'<LogSocket {self.id} - {self.method} {self.path} - {self.status_code}>'
 
+def add_missing_columns():
+    """
+    db.create_all() ne modifie pas les tables existantes: les colonnes ajoutées aux modèles
+    sont créées ici pour que les bases des versions précédentes restent utilisables.
+    """
+    inspector = inspect(db.engine)
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                default = f" DEFAULT {column.server_default.arg}" if column.server_default is not None else ""
+                connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}{default}'))
+
 def init_db(app):
     db.init_app(app)
     with app.app_context():
         db.create_all()
+        add_missing_columns()
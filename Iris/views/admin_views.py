@@ -3,12 +3,23 @@ import os
 import ast
 import json
 from flask import Blueprint, request, render_template, redirect, url_for, flash, make_response, jsonify
-from models.database import db, ApiScript, ApiToken, User, LogSystem, LogWeb, LogApi, LogSocket
-from core.auth import generate_token, auth_required
+from models.database import db, ApiScript, ApiToken, User, LogSystem, LogWeb, LogApi, LogSocket, ApiJob
+from core.auth import generate_token, revoke_token, auth_required
 from views.utils import construct_context
 from core.logging import logs, flash_notification
 from datetime import datetime, timedelta
-from core.fabric import refresh_db
+from core.fabric import refresh_db, registry
+from core.watcher import fabric_watcher
+from core.executor import EXECUTORS
+from core.compression import compression
+from core.singleflight import single_flight
+from core.ratelimit import rate_limiter
+from core.bulkhead import bulkheads
+from core.cache import result_cache
+from core.jobs import jobs
+from core.accounting import accounting
+from core.token_cache import token_cache
+from core.jwt_cache import jwt_cache
 
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -24,6 +35,27 @@ def send_login_info_email(email, username, password):
     logs(f"Envoi de l'email de connexion à {email} pour {username}", status='debug', component='web')
 
 
+def parse_limit(value, cast):
+    """
+    Valeur numérique optionnelle d'un formulaire: vide = pas de limite, sinon strictement positive.
+    """
+    if value is None or not value.strip():
+        return None
+
+    number = cast(value)
+    if number <= 0:
+        raise ValueError(f"{value} doit être strictement positif")
+
+    return number
+
+
+def script_table_stats():
+    """
+    Compteurs affichés dans le tableau des scripts, calculés uniquement par les vues qui le rendent.
+    """
+    return {'runtime_stats': bulkheads.stats(), 'cache_stats': result_cache.stats(), 'compression_stats': compression.stats(), 'coalesce_stats': single_flight.stats(), 'rate_limit_stats': rate_limiter.stats()}
+
+
 @admin_bp.route('/login', methods=['GET', 'POST'])
 def login():
     username_value = None
@@ -65,6 +97,7 @@ def login():
 
 @admin_bp.route('/logout')
 def logout():
+    revoke_token()
     response = make_response(redirect(url_for('admin.login')))
     response.delete_cookie('iris_key')
     return response
@@ -85,12 +118,13 @@ def dashboard_content():
     if __main__.backend.debug:
         logs(f'Récupération du contenu du dashboard', status='debug', component='web', request_info=request.url)
 
-    # Synchroniser les scripts du dossier fabric avec la DB
-    refresh_db(FABRIC_DIR)
+    # Sans surveillance du dossier fabric, synchronisation complète à chaque affichage
+    if not fabric_watcher.running:
+        refresh_db(FABRIC_DIR)
 
     context = construct_context()
 
-    return render_template('admin/partials/dashboard.html', **context)
+    return render_template('admin/partials/dashboard.html', **context, **script_table_stats())
 
 @admin_bp.route('/api/<script_name>/toggle-public', methods=['POST'])
 @auth_required(required_roles=['admin'])
@@ -113,7 +147,7 @@ def toggle_api_public_status(script_name):
 
 
     context = construct_context()
-    html = render_template('admin/partials/_api_scripts_table.html', **context)
+    html = render_template('admin/partials/_api_scripts_table.html', **context, **script_table_stats())
     return jsonify(success=True, html=html)
 
 @admin_bp.route('/api/<script_name>/toggle-online', methods=['POST'])
@@ -136,7 +170,20 @@ def toggle_api_online_status(script_name):
         flash_notification(f"Erreur lors du changement du mode: {err}", 'danger')
 
     context = construct_context()
-    html = render_template('admin/partials/_api_scripts_table.html', **context)
+    html = render_template('admin/partials/_api_scripts_table.html', **context, **script_table_stats())
+    return jsonify(success=True, html=html)
+
+@admin_bp.route('/api/<script_name>/purge-cache', methods=['POST'])
+@auth_required(required_roles=['admin'])
+def purge_api_cache(script_name):
+    script = ApiScript.query.get_or_404(script_name)
+    result_cache.purge(script.id)
+
+    logs(f"Purge du cache de {script_name}", status='info', component='web', request_info=request.url)
+    flash_notification(f"Cache de {script_name} purgé", 'success')
+
+    context = construct_context()
+    html = render_template('admin/partials/_api_scripts_table.html', **context, **script_table_stats())
     return jsonify(success=True, html=html)
 
 @admin_bp.route('/api-scripts/<script_id>/edit-content', methods=['GET'])
@@ -156,11 +203,54 @@ def edit_api_script(script_id):
     script = ApiScript.query.get_or_404(script_id)
     description = request.form.get('description')
     doc = request.form.get('doc')
+    executor = request.form.get('executor') or None
+
+    if executor and executor not in EXECUTORS:
+        logs(f"Edition de l'api {script_id}: mode d'exécution invalide {executor}", status='error', component='web', request_info=request.url)
+        return jsonify(success=False, message='Invalid execution mode.')
+
+    if executor == 'process' and script.path:
+        try:
+            is_stream = registry.get(script_id, os.path.join(FABRIC_DIR, script.path)).is_stream
+        except Exception:
+            # Script en erreur: signalé par la synchronisation du dossier fabric
+            is_stream = False
+
+        if is_stream:
+            logs(f"Edition de l'api {script_id}: mode process indisponible pour un générateur", status='error', component='web', request_info=request.url)
+            return jsonify(success=False, message='Streaming scripts run in the request thread: process mode is not available.')
+
+    try:
+        max_concurrency = parse_limit(request.form.get('max_concurrency'), int)
+        timeout = parse_limit(request.form.get('timeout'), float)
+        cache_ttl = parse_limit(request.form.get('cache_ttl'), float)
+        cache_max_entries = parse_limit(request.form.get('cache_max_entries'), int)
+        rate_limit = parse_limit(request.form.get('rate_limit'), int)
+        rate_burst = parse_limit(request.form.get('rate_burst'), int)
+        token_rate_limit = parse_limit(request.form.get('token_rate_limit'), int)
+    except ValueError as err:
+        logs(f"Edition de l'api {script_id}: limite invalide ({err})", status='error', component='web', request_info=request.url)
+        return jsonify(success=False, message=f'Invalid limit: {err}')
 
     script.description = description
     script.doc = doc
+    script.executor = executor
+    script.max_concurrency = max_concurrency
+    script.timeout = timeout
+    script.cache_ttl = cache_ttl
+    script.cache_max_entries = cache_max_entries
+    script.cache_per_token = request.form.get('cache_per_token') == 'true'
+    script.rate_limit = rate_limit
+    script.rate_burst = rate_burst
+    script.token_rate_limit = token_rate_limit
+    script.coalesce = request.form.get('coalesce') == 'true'
+    script.cache_control = (request.form.get('cache_control') or '').strip() or None
+    script.compress = {'true': True, 'false': False}.get(request.form.get('compress'))
     db.session.commit()
 
+    # La politique de cache a pu changer: on repart d'un cache vide
+    result_cache.purge(script_id)
+
     logs(f"API Script {script_id} updated successfully.", status='success', component='web')
     return jsonify(success=True, message='API Script updated successfully!')
 
@@ -195,7 +285,7 @@ def save_script_environment_vars(script_id):
         logs(f"Variables d'environnements pour {script_id} mise à jour", status='success', component='web')
         
         context = construct_context()
-        html = render_template('admin/partials/_api_scripts_table.html', **context)
+        html = render_template('admin/partials/_api_scripts_table.html', **context, **script_table_stats())
         return jsonify(success=True, html=html)
 
     except Exception as e:
@@ -229,15 +319,23 @@ def create_token():
         logs(f"Création d'un token: Nom du token requis", status='error', component='web', request_info=request.url)
         return jsonify(success=False, message='Token name is required.')
 
+    try:
+        rate_limit = parse_limit(request.form.get('rate_limit'), int)
+        rate_burst = parse_limit(request.form.get('rate_burst'), int)
+    except ValueError as err:
+        logs(f"Création d'un token: limite invalide ({err})", status='error', component='web', request_info=request.url)
+        return jsonify(success=False, message=f'Invalid limit: {err}')
+
     if token_type == 'universal':
         if context['role'] != 'admin':
             flash('Seul les administrateurs peuvent créer un token universal', 'danger')
             logs(f"Création d'un token: Seul les administrateurs peuvent créer un token universal", status='error', component='web', request_info=request.url)
             return jsonify(success=False, message='Only administrators can create universal tokens.')
         
-        new_token = ApiToken(name=name, description=description, creator_id=context['user_id'], token_type='universal')
+        new_token = ApiToken(name=name, description=description, creator_id=context['user_id'], token_type='universal', rate_limit=rate_limit, rate_burst=rate_burst)
         db.session.add(new_token)
         db.session.commit()
+        token_cache.invalidate(new_token.token)
         flash_notification(f"Création du token universal {name} réussi", 'success')
         logs(f"Création du token universal {name} réussi", status='success', component='web', request_info=request.url)
         return jsonify(success=True, redirect_url=url_for('admin.dashboard_content'))
@@ -250,7 +348,7 @@ def create_token():
 
         # Validate selected APIs based on user's permissions
         if context['role'] == 'user' and not context['api_all_access']:
-            allowed_api_ids = {s.id for s in context['api_permissions']}
+            allowed_api_ids = context['api_permission_ids']
         else:
             allowed_api_ids = {s.id for s in ApiScript.query.all()}
         
@@ -261,7 +359,7 @@ def create_token():
             logs(f"Création d'un token: L'utilisateur n'a pas les droits de créer un token pour {invalid_api_list}", status='error', component='web', request_info=request.url)
             return jsonify(success=False, message=f'You do not have permission to create tokens for: {invalid_api_list}')
 
-        new_token = ApiToken(name=name, description=description, creator_id=context['user_id'], token_type='app')
+        new_token = ApiToken(name=name, description=description, creator_id=context['user_id'], token_type='app', rate_limit=rate_limit, rate_burst=rate_burst)
         db.session.add(new_token)
         db.session.commit() # Commit to get token.id for association
 
@@ -271,6 +369,7 @@ def create_token():
             if script:
                 new_token.accessible_scripts.append(script)
         db.session.commit()
+        token_cache.invalidate(new_token.token)
         flash_notification(f"Création du token app {name} réussi", 'success')
         logs(f"Création du token app {name} réussi", status='success', component='web', request_info=request.url)
         return jsonify(success=True, redirect_url=url_for('admin.dashboard_content'))
@@ -313,8 +412,17 @@ def edit_token(token_id):
         logs(f"Edition du token: Nom du token invalide", status='error', component='web', request_info=request.url)
         return jsonify(success=False, message='Token name is required.')
 
+    try:
+        rate_limit = parse_limit(request.form.get('rate_limit'), int)
+        rate_burst = parse_limit(request.form.get('rate_burst'), int)
+    except ValueError as err:
+        logs(f"Edition du token: limite invalide ({err})", status='error', component='web', request_info=request.url)
+        return jsonify(success=False, message=f'Invalid limit: {err}')
+
     token.name = name
     token.description = description
+    token.rate_limit = rate_limit
+    token.rate_burst = rate_burst
 
     # Update accessible APIs only if it's an 'app' token
     if token.token_type == 'app':
@@ -324,7 +432,7 @@ def edit_token(token_id):
             return jsonify(success=False, message='Please select at least one API for an app token.')
 
         if context['role'] == 'user' and not context['api_all_access']:
-            allowed_api_ids = {s.id for s in context['api_permissions']}
+            allowed_api_ids = context['api_permission_ids']
         else:
             allowed_api_ids = {s.id for s in ApiScript.query.all()}
 
@@ -342,6 +450,7 @@ def edit_token(token_id):
                 token.accessible_scripts.append(script)
     
     db.session.commit()
+    token_cache.invalidate(token.token)
     flash_notification(f"Token {name} mis à jour", 'success')
     logs(f"Token mis à jour", status='success', component='web', request_info=request.url)
     return jsonify(success=True, redirect_url=url_for('admin.dashboard_content'))
@@ -385,6 +494,7 @@ def save_token_environment_vars(token_id):
         token.environment_vars = new_environment_vars if new_environment_vars else None
         
         db.session.commit()
+        token_cache.invalidate(token.token)
         flash_notification(f"Variables d'environnements pour le token {token_id} mise à jour", 'success')
         logs(f"Variables d'environnements pour le token {token_id} mise à jour", status='success', component='web')
         
@@ -412,6 +522,7 @@ def toggle_token_status(token_id):
 
         token.is_active = not token.is_active
         db.session.commit()
+        token_cache.invalidate(token.token)
 
         if token.is_active:
             logs(f"Activation du token {token.name}", status='success', component='web', request_info=request.url)
@@ -442,6 +553,7 @@ def delete_token(token_id):
 
     db.session.delete(token)
     db.session.commit()
+    token_cache.invalidate(token.token)
     flash_notification(f'Token {token.name} supprimé', 'success')
     logs(f"Token {token.name} supprimé", status='success', component='web', request_info=request.url)
     return jsonify(success=True)
@@ -805,11 +917,81 @@ def logs_content():
 @auth_required(required_roles=['admin'])
 def get_api_log_response(log_id):
     log_entry = LogApi.query.get_or_404(log_id)
-    response_content = ast.literal_eval(log_entry.response) if log_entry.response else "No response content available."
+    if log_entry.response:
+        # Réponses servies depuis le cache: JSON; anciennes entrées: repr Python
+        try:
+            response_content = json.loads(log_entry.response)
+        except ValueError:
+            response_content = ast.literal_eval(log_entry.response)
+    else:
+        response_content = "No response content available."
 
     print(type(response_content))
     return render_template('admin/modals/api_log_response_modal.html', response_content=response_content)
 
+@admin_bp.route('/jobs-content')
+@auth_required(required_roles=['admin'])
+def jobs_content():
+    if __main__.backend.debug:
+        logs(f'Récupération des tâches de fond', status='debug', component='web', request_info=request.url)
+
+    context = construct_context()
+    context['job_stats'] = jobs.stats()
+    context['recent_jobs'] = ApiJob.query.order_by(ApiJob.created_at.desc()).limit(50).all()
+    return render_template('admin/partials/jobs.html', **context)
+
+def resource_summary(since):
+    """
+    Mesures des appels d'API agrégées par script depuis une date.
+    """
+    rows = db.session.query(
+        LogApi.name,
+        db.func.count(LogApi.id),
+        db.func.avg(LogApi.duration_ms),
+        db.func.max(LogApi.duration_ms),
+        db.func.sum(LogApi.cpu_ms),
+        db.func.avg(LogApi.cpu_ms),
+        db.func.count(LogApi.memory_peak),
+        db.func.max(LogApi.memory_peak),
+        db.func.avg(LogApi.result_size),
+        db.func.max(LogApi.result_size),
+    ).filter(LogApi.duration_ms.isnot(None), LogApi.timestamp >= since).group_by(LogApi.name).all()
+
+    return [{
+        "script": name,
+        "calls": calls,
+        "avg_wall_ms": avg_wall_ms or 0,
+        "max_wall_ms": max_wall_ms or 0,
+        "total_cpu_ms": total_cpu_ms or 0,
+        "avg_cpu_ms": avg_cpu_ms,
+        "memory_samples": memory_samples,
+        "max_memory_peak": max_memory_peak,
+        "avg_result_size": avg_result_size or 0,
+        "max_result_size": max_result_size or 0,
+    } for name, calls, avg_wall_ms, max_wall_ms, total_cpu_ms, avg_cpu_ms, memory_samples, max_memory_peak, avg_result_size, max_result_size in rows]
+
+@admin_bp.route('/resources-content')
+@auth_required(required_roles=['admin'])
+def resources_content():
+    if __main__.backend.debug:
+        logs(f'Récupération des mesures de ressources', status='debug', component='web', request_info=request.url)
+
+    hours = request.args.get('hours', 24, type=int)
+    summary = resource_summary(datetime.utcnow() - timedelta(hours=hours))
+    top_n = accounting.top_n
+
+    context = construct_context()
+    context['hours'] = hours
+    context['memory_sample_rate'] = accounting.memory_sample_rate
+    context['auth_stats'] = {'jwt': jwt_cache.stats(), 'tokens': token_cache.stats()}
+    context['top_tables'] = [
+        ("Total CPU Time", 'total_cpu_ms', sorted(summary, key=lambda row: row['total_cpu_ms'], reverse=True)[:top_n]),
+        ("Average Wall Time", 'avg_wall_ms', sorted(summary, key=lambda row: row['avg_wall_ms'], reverse=True)[:top_n]),
+        ("Peak Memory", 'max_memory_peak', sorted([row for row in summary if row['memory_samples']], key=lambda row: row['max_memory_peak'], reverse=True)[:top_n]),
+        ("Average Result Size", 'avg_result_size', sorted(summary, key=lambda row: row['avg_result_size'], reverse=True)[:top_n]),
+    ]
+    return render_template('admin/partials/resources.html', **context)
+
 @admin_bp.route('/banned')
 @auth_required(required_roles=['admin'])
 def banned_ips():
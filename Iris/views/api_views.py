@@ -1,13 +1,55 @@
 import __main__
 import os
-import importlib.util
-import inspect
-from flask import Blueprint, request, jsonify
-from models.database import ApiScript, ApiToken
+from flask import Blueprint, request, jsonify, current_app, url_for, after_this_request
+from werkzeug.datastructures import MultiDict, Headers
+from models.database import db, ApiScript, ApiJob
 from core.logging import logs
-import sys
+from core.fabric import registry
+from core.binder import BindingError
+from core.executor import resolve_executor, run_entrypoint, submit_batch, ExecutionTimeout
+from core.bulkhead import bulkheads
+from core.cache import result_cache, resolve_cache_policy, make_cache_key
+from core.streaming import is_stream_result, iter_stream, resolve_stream_format, stream_response
+from core.jobs import jobs
+from core.warmup import warmup
+from core.serializer import dumps
+from core.compression import resolve_compression
+from core.etag import make_etag, resolve_cache_control, match_etag, set_validators, not_modified
+from core.singleflight import single_flight, resolve_coalesce, CoalesceTimeout
+from core.ratelimit import rate_limiter, resolve_rate_limits
+from core.accounting import accounting
+from core.token_cache import token_cache
+import json
+from datetime import datetime
 import zpp_store
 
+class RequestSnapshot:
+    """
+    Copie sérialisable des informations de la requête, utilisée hors du thread de la requête.
+    """
+    def __init__(self, method, url, path, args, headers, remote_addr):
+        self.method = method
+        self.url = url
+        self.path = path
+        self.args = MultiDict(args)
+        self.headers = Headers(headers)
+        self.remote_addr = remote_addr
+
+    @classmethod
+    def from_request(cls, request):
+        return cls(request.method, request.url, request.path, list(request.args.items(multi=True)), list(request.headers.items()), request.remote_addr)
+
+    def to_state(self):
+        return {
+            "method": self.method,
+            "url": self.url,
+            "path": self.path,
+            "args": list(self.args.items(multi=True)),
+            "headers": list(self.headers.items()),
+            "remote_addr": self.remote_addr,
+        }
+
+
 class ApiContext:
     def __init__(self, request, token_str, username, script_environment_vars=None, token_environment_vars=None):
         self.request = request
@@ -17,26 +59,100 @@ class ApiContext:
         # Start with script environment variables
         script_environment_vars = script_environment_vars if script_environment_vars is not None else {}
         token_environment_vars = token_environment_vars if token_environment_vars is not None else {}
-            
+
+        self._token_environment_vars = token_environment_vars
+        self._script_environment_vars = script_environment_vars
         self.token_environment_vars = zpp_store.structure(token_environment_vars)
         self.script_environment_vars = zpp_store.structure(script_environment_vars)
 
+        # Clé de version du résultat, fournie par le script: l'ETag en est dérivé sans hacher la réponse
+        self.version = None
+
+    def set_version(self, version):
+        self.version = version
+
+    def to_state(self):
+        """
+        État sérialisable du contexte, transmis aux workers d'exécution.
+        """
+        request_state = self.request.to_state() if isinstance(self.request, RequestSnapshot) else RequestSnapshot.from_request(self.request).to_state()
+        return {
+            "request": request_state,
+            "token": self.token,
+            "username": self.username,
+            "script_environment_vars": self._script_environment_vars,
+            "token_environment_vars": self._token_environment_vars,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(RequestSnapshot(**state['request']), state['token'], state['username'], state['script_environment_vars'], state['token_environment_vars'])
+
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 FABRIC_DIR = 'fabric'
 
 
-def failed_api(message, status_code):
+def failed_api(message, status_code, details=None):
     if __main__.backend.enable_auto_protect:
         response = __main__.backend.protect.auto_protect()
         if response:
             return response
 
+    if details:
+        return jsonify({"error": message, "details": details}), status_code
+
     return jsonify({"error": message}), status_code
 
 
+def get_bearer_token():
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+
+    return auth_header.split(" ")[1]
+
+
+def has_script_access(token, script_db):
+    # Un jeton 'app' n'accède qu'à ses scripts; un jeton 'universal' accède à tous les scripts non-publics
+    if token.token_type == 'app':
+        return script_db.id in token.script_ids
+
+    return True
+
+
+@api_bp.route('/_ready')
+def api_ready():
+    # Sonde de disponibilité: 503 tant que le préchargement des scripts n'est pas terminé
+    failed = sorted(script_id for script_id, result in warmup.results.items() if result['error'])
+    return jsonify({"ready": warmup.ready, "failed": failed}), 200 if warmup.ready else 503
+
+
 @api_bp.route('/<script_name>')
 def api_hub(script_name):
+    query_args = request.args
+    as_job = query_args.get('async', '').lower() in ('1', 'true')
+    if 'async' in query_args:
+        # Paramètre réservé au mode tâche de fond: il n'est pas transmis au script
+        query_args = query_args.copy()
+        query_args.poplist('async')
+
+    return call_script(script_name, query_args, as_job)
+
+
+@api_bp.route('/<script_name>/jobs', methods=['POST'])
+def api_create_job(script_name):
+    # Arguments en JSON dans le corps, sinon dans la query string
+    payload = request.get_json(silent=True)
+    query_args = _to_query_args(payload) if isinstance(payload, dict) else request.args
+    return call_script(script_name, query_args, as_job=True)
+
+
+def call_script(script_name, query_args, as_job=False):
+    """
+    Appel d'un script fabric: permissions, liaison des arguments, cache, limites puis exécution.
+    Avec as_job, l'appel est mis en file et l'identifiant de la tâche est renvoyé immédiatement (202).
+    """
     if __main__.backend.debug:
         logs(f"Tentative d'accès à l'api", status='debug', component='api', request_info=request.url, api_name=script_name)
 
@@ -65,13 +181,12 @@ def api_hub(script_name):
                 #Pas de Fail2Ban sur cette requête car juste si offline, pas de bruteforce possible
                 return jsonify({'error': 'api offline'}), 503
             if not script_db.is_public:
-                auth_header = request.headers.get('Authorization')
-                if not auth_header or not auth_header.startswith('Bearer '):
+                token_str = get_bearer_token()
+                if not token_str:
                     logs(f"Authentification requise", status='unauthorized', component='api', request_info=request.url, api_name=script_name)
                     return failed_api("Authentification requise", 401)
                 
-                token_str = auth_header.split(" ")[1]
-                token = ApiToken.query.filter_by(token=token_str).first()
+                token = token_cache.get(token_str)
                 if not token:
                     logs(f"Le token utilisé est invalide", status='unauthorized', component='api', token=token_str, request_info=request.url, api_name=script_name)
                     return failed_api("Le token utilisé est invalide", 403)
@@ -84,65 +199,453 @@ def api_hub(script_name):
                 token_id = token.id
 
                 # Nouvelle logique de vérification des permissions du token
-                if token.token_type == 'app':
-                    # Vérifier si le script demandé fait partie des scripts accessibles par ce token
-                    if script_db not in token.accessible_scripts:
-                        logs(f"Le token utilisé n'a pas les permissions pour cette api", status='unauthorized', component='api', token=token_str, request_info=request.url, api_name=script_name)
-                        return failed_api("Le token utilisé n'a pas les permissions pour cette api", 403)
-                        #return jsonify({"error": "Token does not have access to this API"}), 403
-                # Si token.token_type == 'universal', l'accès est implicitement accordé ici
+                if not has_script_access(token, script_db):
+                    logs(f"Le token utilisé n'a pas les permissions pour cette api", status='unauthorized', component='api', token=token_str, request_info=request.url, api_name=script_name)
+                    return failed_api("Le token utilisé n'a pas les permissions pour cette api", 403)
+                    #return jsonify({"error": "Token does not have access to this API"}), 403
 
         if not script_db.path:
             logs(f"Chemin de l'api inexistante dans la base", status='bad_request', component='api', request_info=request.url)
             return failed_api("Chemin de l'api inexistante dans la base", 404)
 
+        # Limitation de débit en mémoire (script, token, couple token/script), avant tout chargement ou exécution
+        rate_limit = rate_limiter.check(script_name, resolve_rate_limits(script_db, token))
+        if rate_limit is not None:
+            if not rate_limit.allowed:
+                logs(f"Limite de requêtes atteinte", status='warning', component='api', token=token_str, request_info=request.url, api_name=script_name)
+                #Pas de Fail2Ban: le token est valide, seul le débit est limité
+                return rate_limit.apply(jsonify({'error': "Limite de requêtes atteinte"})), 429
 
-        script_path = os.path.join(FABRIC_DIR, script_db.path)
+            after_this_request(rate_limit.apply)
 
-        dir_path = os.path.dirname(script_path)
-        sys.path.append(dir_path)
+        script_path = os.path.join(FABRIC_DIR, script_db.path)
 
-        spec = importlib.util.spec_from_file_location(script_name, script_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        # Module mis en cache: le script n'est ré-exécuté que si le fichier a changé
+        loaded_script = registry.get(script_name, script_path)
+        main_func = loaded_script.entrypoint
 
-        main_func = None
-        for name, func in inspect.getmembers(module, inspect.isfunction):
-            if hasattr(func, '_is_entrypoint') and func._is_entrypoint:
-                main_func = func
-                break
-        
         if main_func is None:
             logs(f"Aucun @entrypoint trouvé", status='error', component='api', token=token_str, request_info=request.url, api_name=script_name)
-            sys.path.remove(dir_path)
             return jsonify({"error": f"Aucun @entrypoint trouvé dans {script_name}"}), 500
 
-        func_args = inspect.signature(main_func).parameters
-        query_params = request.args.to_dict()
-        
-        missing_args = [name for name, param in func_args.items() if param.default == inspect.Parameter.empty and name not in query_params]
-        if missing_args:
-            logs(f"Arguments manquants {', '.join(missing_args)}", status='bad_request', component='api', token=token_str, request_info=request.url, result=str(missing_args), api_name=script_name)
-            sys.path.remove(dir_path)
-            return failed_api(f"Arguments manquants: {', '.join(missing_args)}", 400)
-            #return jsonify({"error": f"Missing required arguments: {', '.join(missing_args)}"}), 400
+        try:
+            call_args = loaded_script.binder.bind(query_args)
+        except BindingError as err:
+            logs(err.message, status='bad_request', component='api', token=token_str, request_info=request.url, result=str(err.errors), api_name=script_name)
+            return failed_api(err.message, 400, details=err.errors)
 
-        call_args = {name: query_params[name] for name in func_args if name in query_params}
-
-        from core.environment_manager import EnvironmentContext
+        # Compression de la réponse désactivable par script; le temps de compression est mesuré par script
+        request.compress = resolve_compression(script_db, loaded_script)
+        request.api_name = script_name
 
         from views.utils import construct_context
+
+        if as_job:
+            # La requête sera terminée pendant l'exécution: le script reçoit une copie de ses informations
+            username = construct_context()['username']
+            api_context_instance = ApiContext(RequestSnapshot.from_request(request), token_str, username, script_db.environment_vars, token.environment_vars if token else None)
+
+            # Même limite d'exécutions simultanées qu'un appel direct: la place est gardée jusqu'à la fin de la tâche
+            bulkhead = bulkheads.get(script_name)
+            if not bulkhead.acquire(script_db.max_concurrency):
+                logs(f"Nombre maximal d'exécutions simultanées atteint", status='warning', component='api', token=token_str, request_info=request.url, api_name=script_name)
+                return jsonify({'error': "Nombre maximal d'exécutions simultanées atteint"}), 429
+
+            try:
+                job = jobs.submit(script_db, loaded_script, call_args, api_context_instance, resolve_executor(script_db, loaded_script), bulkhead)
+            except BaseException:
+                bulkhead.release()
+                raise
+
+            logs(f"Tâche {job.id} mise en file", status='info', component='api', token=token_str, request_info=request.url, api_name=script_name)
+            response = jsonify({
+                "job_id": job.id,
+                "status": 'queued',
+                "status_url": url_for('api.api_job_status', job_id=job.id),
+                "result_url": url_for('api.api_job_result', job_id=job.id),
+            })
+            response.headers['Location'] = url_for('api.api_job_status', job_id=job.id)
+            return response, 202
+
+        cache_control = resolve_cache_control(script_db, loaded_script)
+
+        # Cache des résultats: un hit ne passe ni par le contexte ni par l'exécution du script
+        cache_policy = None if loaded_script.is_stream else resolve_cache_policy(script_db, loaded_script)
+        if cache_policy:
+            cache_key = make_cache_key(call_args, token_str if cache_policy.per_token else None)
+            cached = result_cache.get(script_name, cache_key)
+            if cached is not None:
+                # Requête conditionnelle: 304 sans exécuter le script ni relire le corps
+                matched_etag = match_etag(cached.etag)
+                if matched_etag:
+                    logs(f"Accès à l'api réussi (cache, non modifié)", status='success', component='api', token=token_str, request_info=request.url, api_name=script_name, cache_hit=True)
+                    return not_modified(matched_etag, cache_control)
+
+                logs(f"Accès à l'api réussi (cache)", status='success', component='api', token=token_str, request_info=request.url, result=cached.body.decode(), api_name=script_name, cache_hit=True)
+                return set_validators(current_app.response_class(cached.body, mimetype='application/json'), cached.etag, cache_control)
+
+        # Appels identiques simultanés: une seule exécution, dont le résultat est partagé avec les appels en attente
+        flight = None
+        if not loaded_script.is_stream and resolve_coalesce(script_db, loaded_script):
+            flight, leader = single_flight.join(script_name, make_cache_key(call_args, token_str))
+            if leader:
+                request.flight = flight
+            else:
+                try:
+                    single_flight.wait(flight, script_db.timeout)
+                except CoalesceTimeout as err:
+                    logs(f"Délai d'attente du résultat partagé dépassé", status='error', component='api', token=token_str, request_info=request.url, result=str(err), api_name=script_name)
+                    return jsonify({'error': "Délai d'attente du résultat partagé dépassé"}), 504
+
+                if isinstance(flight.error, ExecutionTimeout):
+                    logs(f"Délai d'exécution dépassé (partagé)", status='error', component='api', token=token_str, request_info=request.url, result=str(flight.error), api_name=script_name)
+                    return jsonify({'error': "Délai d'exécution dépassé"}), 504
+
+                if flight.error is not None:
+                    logs(f"Erreur lors de l'accès à l'api (partagé): {flight.error}", status='error', component='api', token=token_str, request_info=request.url, result=str(flight.error), api_name=script_name)
+                    return jsonify({"error": f"Erreur lors de l'accès à l'api"}), 500
+
+                if flight.body is not None:
+                    logs(f"Accès à l'api réussi (partagé)", status='success', component='api', token=token_str, request_info=request.url, result=flight.body.decode('utf-8'), api_name=script_name)
+                    matched_etag = match_etag(flight.etag)
+                    if matched_etag:
+                        return not_modified(matched_etag, cache_control)
+
+                    return set_validators(current_app.response_class(flight.body, mimetype='application/json'), flight.etag, cache_control)
+
+                # Pas de résultat partageable (flux, limite atteinte...): exécution normale
+                flight = None
+
         context = construct_context()
         # Create API context
         api_context_instance = ApiContext(request, token_str, context['username'], script_db.environment_vars, token.environment_vars if token else None)
 
-        with EnvironmentContext(api_context_instance):
-            result = main_func(**call_args)
+        # Cloisonnement: limite d'exécutions simultanées et délai maximal par script
+        bulkhead = bulkheads.get(script_name)
+        if not bulkhead.acquire(script_db.max_concurrency):
+            logs(f"Nombre maximal d'exécutions simultanées atteint", status='warning', component='api', token=token_str, request_info=request.url, api_name=script_name)
+            return jsonify({'error': "Nombre maximal d'exécutions simultanées atteint"}), 429
+
+        log_info = {"token": token_str, "request_info": request.url, "api_name": script_name}
+
+        usage = accounting.new_usage()
+
+        if loaded_script.is_stream:
+            # Générateur: consommé par la réponse dans le thread de la requête, l'exécution se termine à la fermeture du flux
+            # Le délai maximal s'applique au temps passé dans le générateur; le mode 'process' n'est pas disponible
+            try:
+                result = loaded_script.entrypoint(**call_args)
+                response = stream_response(result, api_context_instance, resolve_stream_format(loaded_script, request.accept_mimetypes), log_info, on_close=bulkhead.release, usage=usage, timeout=script_db.timeout, on_timeout=bulkhead.record_timeout)
+            except BaseException:
+                bulkhead.release()
+                raise
+
+            return response
+
+        try:
+            result = run_entrypoint(loaded_script, call_args, api_context_instance, resolve_executor(script_db, loaded_script), timeout=script_db.timeout, on_done=bulkhead.release, usage=usage)
+        except ExecutionTimeout as err:
+            bulkhead.record_timeout()
+            if flight:
+                single_flight.complete(flight, error=err)
+            logs(f"Délai d'exécution dépassé", status='error', component='api', token=token_str, request_info=request.url, result=str(err), api_name=script_name)
+            return jsonify({'error': "Délai d'exécution dépassé"}), 504
 
-        sys.path.remove(dir_path)
-        logs(f"Accès à l'api réussi", status='success', component='api', token=token_str, request_info=request.url, result=str(result), api_name=script_name)
-        return jsonify(result)
+        if is_stream_result(result):
+            # Itérateur renvoyé par un point d'entrée classique: envoyé en flux lui aussi
+            return stream_response(result, api_context_instance, resolve_stream_format(loaded_script, request.accept_mimetypes), log_info, usage=usage)
+
+        # Un seul encodage: les mêmes octets servent à la réponse, au cache et au log
+        body = dumps(result)
+        etag = make_etag(body, api_context_instance.version)
+        if flight:
+            single_flight.complete(flight, body, etag)
+        if usage:
+            usage.result_size = len(body)
+        logs(f"Accès à l'api réussi", status='success', component='api', token=token_str, request_info=request.url, result=body.decode('utf-8'), api_name=script_name, usage=usage)
+
+        if cache_policy:
+            result_cache.put(script_name, cache_key, body, cache_policy, etag)
+
+        matched_etag = match_etag(etag)
+        if matched_etag:
+            return not_modified(matched_etag, cache_control)
+
+        return set_validators(current_app.response_class(body, mimetype='application/json'), etag, cache_control)
 
     except Exception as e:
+        flight = getattr(request, 'flight', None)
+        if flight:
+            single_flight.complete(flight, error=e)
         logs(f"Erreur lors de l'accès à l'api: {e}", status='error', component='api', token=token_str, request_info=request.url, result=str(e), api_name=script_name)
         return jsonify({"error": f"Erreur lors de l'accès à l'api"}), 500
+
+
+@api_bp.teardown_request
+def release_flight(exc):
+    # Les appels en attente sont libérés quelle que soit l'issue de la requête du leader
+    flight = getattr(request, 'flight', None)
+    if flight:
+        single_flight.complete(flight)
+
+
+class BatchCall:
+    """
+    Un appel d'un lot /api/_batch: préparé dans le thread de la requête, exécuté dans le pool du lot.
+    """
+    def __init__(self, index, item):
+        self.index = index
+        self.item = item if isinstance(item, dict) else {}
+        self.id = self.item.get('id')
+        self.script_name = self.item.get('script')
+        self.status = None
+        self.error = None
+        self.details = None
+        self.protect = False
+        self.body = None
+        self.api_context = None
+        self.usage = accounting.new_usage()
+        self.future = None
+
+    def fail(self, message, status_code, log_status, token_str=None, details=None, protect=True):
+        # Mêmes messages que api_hub; protect: l'échec compte pour le Fail2Ban comme avec failed_api
+        logs(message, status=log_status, component='api', token=token_str, request_info=request.url, result=str(details) if details else None, api_name=self.script_name)
+        self.status = status_code
+        self.error = message
+        self.details = details
+        self.protect = protect
+        return self
+
+    def encode(self):
+        entry = {"script": self.script_name, "status": self.status}
+        if self.id is not None:
+            entry["id"] = self.id
+        if self.error:
+            entry["error"] = self.error
+            if self.details:
+                entry["details"] = self.details
+            return dumps(entry)
+
+        # Le corps déjà encodé (exécution ou cache) est inséré tel quel
+        return dumps(entry)[:-1] + b',"result":' + self.body + b'}'
+
+
+def _to_query_args(args):
+    # Les arguments JSON du lot sont ramenés à la forme des paramètres de requête attendue par le binder
+    query_args = MultiDict()
+    for name, value in args.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            query_args.add(name, 'true' if value else 'false')
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                query_args.add(name, json.dumps(item) if isinstance(item, (dict, list)) else str(item))
+        elif isinstance(value, dict):
+            query_args.add(name, json.dumps(value))
+        else:
+            query_args.add(name, str(value))
+
+    return query_args
+
+
+def _prepare_batch_call(call, token, token_str, username):
+    script_name = call.script_name
+    if not isinstance(script_name, str) or not script_name:
+        return call.fail("Nom d'api invalide", 400, 'bad_request', token_str)
+    if '..' in script_name or '/' in script_name:
+        return call.fail("Nom d'api invalide", 400, 'bad_request', token_str)
+
+    args = call.item.get('args') or {}
+    if not isinstance(args, dict):
+        return call.fail("Arguments invalides: objet attendu", 400, 'bad_request', token_str)
+
+    script_db = ApiScript.query.get(script_name)
+    if not script_db:
+        return call.fail("api inexistante", 404, 'bad_request', token_str)
+    if not script_db.is_online:
+        return call.fail("api offline", 503, 'error', protect=False)
+    if not script_db.is_public:
+        if not token:
+            return call.fail("Authentification requise", 401, 'unauthorized')
+        if not has_script_access(token, script_db):
+            return call.fail("Le token utilisé n'a pas les permissions pour cette api", 403, 'unauthorized', token_str)
+
+    if not script_db.path:
+        return call.fail("Chemin de l'api inexistante dans la base", 404, 'bad_request', token_str)
+
+    rate_limit = rate_limiter.check(script_name, resolve_rate_limits(script_db, None if script_db.is_public else token))
+    if rate_limit is not None and not rate_limit.allowed:
+        return call.fail("Limite de requêtes atteinte", 429, 'warning', token_str, protect=False)
+
+    script_path = os.path.join(FABRIC_DIR, script_db.path)
+
+    loaded_script = registry.get(script_name, script_path)
+    if loaded_script.entrypoint is None:
+        return call.fail(f"Aucun @entrypoint trouvé dans {script_name}", 500, 'error', token_str, protect=False)
+    if loaded_script.is_stream:
+        return call.fail("Les réponses en flux ne sont pas disponibles dans un lot", 400, 'bad_request', token_str, protect=False)
+
+    try:
+        call_args = loaded_script.binder.bind(_to_query_args(args))
+    except BindingError as err:
+        return call.fail(err.message, 400, 'bad_request', token_str, details=err.errors)
+
+    call.script_db = script_db
+    call.loaded_script = loaded_script
+    call.call_args = call_args
+
+    call.cache_policy = resolve_cache_policy(script_db, loaded_script)
+    if call.cache_policy:
+        call.cache_key = make_cache_key(call_args, token_str if call.cache_policy.per_token else None)
+        cached = result_cache.get(script_name, call.cache_key)
+        if cached is not None:
+            logs(f"Accès à l'api réussi (cache)", status='success', component='api', token=token_str, request_info=request.url, result=cached.body.decode(), api_name=script_name, cache_hit=True)
+            call.status = 200
+            call.body = cached.body
+            return call
+
+    call.bulkhead = bulkheads.get(script_name)
+    if not call.bulkhead.acquire(script_db.max_concurrency):
+        return call.fail("Nombre maximal d'exécutions simultanées atteint", 429, 'warning', token_str, protect=False)
+
+    call.api_context = ApiContext(request, token_str, username, script_db.environment_vars, token.environment_vars if token else None)
+    try:
+        call.future = submit_batch(_run_batch_call, call, call.api_context)
+    except BaseException:
+        call.bulkhead.release()
+        raise
+
+    return call
+
+
+def _run_batch_call(call, api_context):
+    result = run_entrypoint(call.loaded_script, call.call_args, api_context, resolve_executor(call.script_db, call.loaded_script), timeout=call.script_db.timeout, on_done=call.bulkhead.release, usage=call.usage)
+    if is_stream_result(result):
+        # Pas de flux dans un lot: l'itérateur est consommé dans le worker
+        result = list(iter_stream(result, api_context, call.usage))
+
+    return result
+
+
+@api_bp.route('/_batch', methods=['POST'])
+def api_batch():
+    """
+    Exécute plusieurs appels de scripts en une seule requête HTTP.
+    Le jeton est vérifié une fois; les permissions, logs et limites de chaque script restent ceux de api_hub.
+    """
+    token_str = get_bearer_token()
+    token = None
+    try:
+        if token_str:
+            token = token_cache.get(token_str)
+            if not token:
+                logs(f"Le token utilisé est invalide", status='unauthorized', component='api', token=token_str, request_info=request.url)
+                return failed_api("Le token utilisé est invalide", 403)
+
+            if not token.is_active:
+                logs(f"Le token utilisé est désactivé", status='unauthorized', component='api', token=token_str, request_info=request.url)
+                return failed_api("Le token utilisé est désactivé", 403)
+
+        payload = request.get_json(silent=True)
+        items = payload.get('items') if isinstance(payload, dict) else payload
+        if not isinstance(items, list) or not items:
+            logs(f"Lot invalide: liste d'appels attendue", status='bad_request', component='api', token=token_str, request_info=request.url)
+            return failed_api("Lot invalide: liste d'appels attendue", 400)
+
+        max_items = __main__.backend.app_settings.get("batch.max_items", 50)
+        if len(items) > max_items:
+            logs(f"Lot trop grand ({len(items)} appels)", status='bad_request', component='api', token=token_str, request_info=request.url)
+            return jsonify({"error": f"Lot trop grand: {max_items} appels maximum"}), 413
+
+        from views.utils import construct_context
+        username = construct_context()['username']
+
+        # Préparation dans le thread de la requête (base de données, logs), exécution en parallèle dans le pool du lot
+        calls = []
+        for index, item in enumerate(items):
+            call = BatchCall(index, item)
+            try:
+                _prepare_batch_call(call, token, token_str, username)
+            except Exception as err:
+                call.fail(f"Erreur lors de l'accès à l'api: {err}", 500, 'error', token_str, protect=False)
+                call.error = "Erreur lors de l'accès à l'api"
+            calls.append(call)
+
+        for call in calls:
+            if call.future is None:
+                continue
+
+            try:
+                result = call.future.result()
+            except ExecutionTimeout:
+                call.bulkhead.record_timeout()
+                call.fail("Délai d'exécution dépassé", 504, 'error', token_str, protect=False)
+                continue
+            except Exception as err:
+                logs(f"Erreur lors de l'accès à l'api: {err}", status='error', component='api', token=token_str, request_info=request.url, result=str(err), api_name=call.script_name)
+                call.status = 500
+                call.error = "Erreur lors de l'accès à l'api"
+                continue
+
+            call.status = 200
+            call.body = dumps(result)
+            if call.usage:
+                call.usage.result_size = len(call.body)
+            logs(f"Accès à l'api réussi", status='success', component='api', token=token_str, request_info=request.url, result=call.body.decode('utf-8'), api_name=call.script_name, usage=call.usage)
+
+            if call.cache_policy:
+                result_cache.put(call.script_name, call.cache_key, call.body, call.cache_policy, make_etag(call.body, call.api_context.version))
+
+        if __main__.backend.enable_auto_protect:
+            # Un échec par appel, comme si chaque appel avait été fait séparément
+            for call in calls:
+                if call.protect:
+                    response = __main__.backend.protect.auto_protect()
+                    if response:
+                        return response
+
+        body = b'[' + b','.join(call.encode() for call in calls) + b']'
+        return current_app.response_class(body, mimetype='application/json')
+
+    except Exception as e:
+        logs(f"Erreur lors de l'exécution du lot: {e}", status='error', component='api', token=token_str, request_info=request.url, result=str(e))
+        return jsonify({"error": f"Erreur lors de l'exécution du lot"}), 500
+
+
+def _get_job(job_id):
+    job = db.session.get(ApiJob, job_id)
+    if not job or (job.expires_at and job.expires_at < datetime.utcnow()):
+        logs(f"Tâche inexistante ou expirée", status='bad_request', component='api', request_info=request.url)
+        return None, failed_api("Tâche inexistante ou expirée", 404)
+
+    # Une tâche lancée avec un token n'est lisible qu'avec ce même token
+    if job.token and get_bearer_token() != job.token:
+        logs(f"Le token utilisé n'a pas les permissions pour cette tâche", status='unauthorized', component='api', token=get_bearer_token(), request_info=request.url, api_name=job.script_id)
+        return None, failed_api("Le token utilisé n'a pas les permissions pour cette tâche", 403)
+
+    return job, None
+
+
+@api_bp.route('/_jobs/<job_id>')
+def api_job_status(job_id):
+    job, error = _get_job(job_id)
+    if error:
+        return error
+
+    return jsonify(job.to_dict())
+
+
+@api_bp.route('/_jobs/<job_id>/result')
+def api_job_result(job_id):
+    job, error = _get_job(job_id)
+    if error:
+        return error
+
+    if job.status in ('queued', 'running'):
+        return jsonify(job.to_dict()), 202
+
+    if job.status != 'success':
+        return jsonify({"error": job.error, "status": job.status}), 504 if job.status == 'timeout' else 500
+
+    return current_app.response_class(job.result, mimetype='application/json')
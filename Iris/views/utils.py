@@ -1,40 +1,98 @@
-from core.auth import get_user_id, get_username, get_role, get_api_all_access, get_api_permissions
+from collections.abc import MutableMapping
+from flask import g
+from core.auth import get_user_id, get_username, get_role, get_api_all_access, get_api_permissions, get_api_permission_ids
 from models.database import db, ApiScript, ApiToken, User
 import __main__
 
 
-def construct_context():
-	if hasattr(__main__, "backend") and hasattr(__main__.backend, "auth_required") and __main__.backend.auth_required:
-		context = {
-			"username": get_username(),
-			"role": get_role(),
-			"user_id": get_user_id(),
-			"api_all_access": get_api_all_access(),
-			"api_permissions": get_api_permissions(),
-		}
-	else:
+IDENTITY_FIELDS = ('user_id', 'username', 'role', 'api_all_access', 'api_permissions', 'api_permission_ids')
+
+
+class RequestContext(MutableMapping):
+	"""
+	Contexte de la requête calculé à la demande: un champ n'est chargé qu'au premier accès.
+	L'identité est mémorisée dans flask.g pour toute la requête. Les listes (scripts, tokens, users) restent propres à chaque
+	appel de construct_context, rappelé par les vues après une modification pour afficher les tables à jour.
+	"""
+	def __init__(self, identity):
+		self._identity = identity
+		self._values = {}
+
+	def _load_user_id(self):
+		if hasattr(__main__, "backend") and hasattr(__main__.backend, "auth_required") and __main__.backend.auth_required:
+			return get_user_id()
+
 		#Fake context lorsque l'authentification est désactivé
-		context = {
-			"user_id": 1,
-			"username": get_username(user_id=1),
-			"role": get_role(user_id=1),
-			"api_all_access": get_api_all_access(user_id=1),
-			"api_permissions": get_api_permissions(user_id=1),
-		}
-
-		
-	if context["role"] == 'admin':
-		context['scripts'] = ApiScript.query.all()
-		context['tokens'] = ApiToken.query.all()
-		context['users'] = User.query.all()
-	else: # role == 'user'
-		user = User.query.filter_by(id=context["user_id"]).first()
-		if user:
-			if user.api_all_access==True:
-				context['scripts'] = ApiScript.query.all()
-			else:
-				context['scripts'] = user.api_permissions # Scripts for which the user has permission to generate tokens
-		context['tokens'] = ApiToken.query.filter_by(creator_id=context["user_id"]).all() # Tokens created by this user
-
-
-	return context
\ No newline at end of file
+		return 1
+
+	def _load_username(self):
+		return get_username(user_id=self['user_id']) if self['user_id'] else None
+
+	def _load_role(self):
+		return get_role(user_id=self['user_id']) if self['user_id'] else None
+
+	def _load_api_all_access(self):
+		return get_api_all_access(user_id=self['user_id']) if self['user_id'] else None
+
+	def _load_api_permissions(self):
+		return get_api_permissions(user_id=self['user_id']) if self['user_id'] else None
+
+	def _load_api_permission_ids(self):
+		return get_api_permission_ids(user_id=self['user_id']) if self['user_id'] else frozenset()
+
+	def _load_scripts(self):
+		if self['role'] == 'admin' or self['api_all_access']:
+			return ApiScript.query.all()
+
+		return self['api_permissions'] # Scripts for which the user has permission to generate tokens
+
+	def _load_tokens(self):
+		if self['role'] == 'admin':
+			return ApiToken.query.all()
+
+		return ApiToken.query.filter_by(creator_id=self['user_id']).all() # Tokens created by this user
+
+	def _load_users(self):
+		return User.query.all()
+
+	def _fields(self):
+		fields = list(IDENTITY_FIELDS)
+		if self['role'] == 'admin':
+			fields += ['scripts', 'tokens', 'users']
+		else: # role == 'user'
+			if self['api_all_access'] is not None:
+				fields.append('scripts')
+			fields.append('tokens')
+
+		return fields + [key for key in self._values if key not in fields]
+
+	def __getitem__(self, key):
+		if key in self._values:
+			return self._values[key]
+
+		if key in IDENTITY_FIELDS:
+			if key not in self._identity:
+				self._identity[key] = getattr(self, f'_load_{key}')()
+			return self._identity[key]
+
+		if key in ('scripts', 'tokens', 'users') and key in self._fields():
+			self._values[key] = getattr(self, f'_load_{key}')()
+			return self._values[key]
+
+		raise KeyError(key)
+
+	def __setitem__(self, key, value):
+		self._values[key] = value
+
+	def __delitem__(self, key):
+		del self._values[key]
+
+	def __iter__(self):
+		return iter(self._fields())
+
+	def __len__(self):
+		return len(self._fields())
+
+
+def construct_context():
+	return RequestContext(g.setdefault('iris_identity', {}))
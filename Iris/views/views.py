@@ -2,13 +2,11 @@ from flask import Blueprint, render_template, jsonify, request, Response
 from models.database import ApiScript, User
 from views.utils import construct_context
 import os
-import sys
-import importlib
-import inspect
 import __main__
 import time
 import json
 from core.logging import logs
+from core.fabric import registry
 from views.api_views import failed_api
 
 route_bp = Blueprint('root', __name__, url_prefix='/')
@@ -92,29 +90,13 @@ def api_details(script_name):
             return failed_api("Accès refusé", 403)
 
     try:
-        dir_path = os.path.dirname(script_path)
-        sys.path.append(dir_path)
-
-        spec = importlib.util.spec_from_file_location(script_name, script_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-
-        main_func = None
-        for name, func in inspect.getmembers(module, inspect.isfunction):
-            if hasattr(func, '_is_entrypoint') and func._is_entrypoint:
-                main_func = func
-                break
-        
-        if main_func is None:
+        loaded_script = registry.get(script_name, script_path)
+
+        if loaded_script.entrypoint is None:
             logs(f"Aucun @entrypoint trouvé pour {script_name}", status='error', component='web', request_info=request.url)
-            sys.path.remove(dir_path)
             return jsonify({"error": f"No @entrypoint function found in {script_name}"}), 500
 
-        parameters = []
-        for name, param in inspect.signature(main_func).parameters.items():
-            param_type = str(param.annotation) if param.annotation != inspect.Parameter.empty else "Any"
-            parameters.append({"name": name, "type": param_type})
-        sys.path.remove(dir_path)
+        parameters = loaded_script.binder.describe()
 
         return render_template('modals/api_details.html', script_name=script_name, parameters=parameters, api=api_script, **context)
 
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+# Les modules de l'application sont importés comme au lancement depuis le dossier Iris (core.*, models.*...)
+IRIS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Iris')
+if IRIS_DIR not in sys.path:
+    sys.path.insert(0, IRIS_DIR)
+
+
+@pytest.fixture
+def app(tmp_path):
+    """
+    Application minimale sur une base SQLite temporaire, avec un contexte d'application actif.
+    """
+    from models.database import init_db
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'app.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    init_db(app)
+
+    with app.app_context():
+        yield app
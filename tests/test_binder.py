@@ -0,0 +1,196 @@
+import dataclasses
+import datetime
+import typing
+
+import pytest
+from werkzeug.datastructures import MultiDict
+from core.binder import ArgumentBinder, BindingError
+
+
+class Point(typing.TypedDict):
+    x: int
+    y: int
+
+
+class Window(typing.TypedDict, total=False):
+    start: str
+
+
+@dataclasses.dataclass
+class Options:
+    name: str
+    level: int = 1
+
+
+def bind(func, **params):
+    return ArgumentBinder(func).bind(MultiDict(params))
+
+
+@pytest.mark.parametrize('raw, expected', [
+    ('1', True), ('true', True), ('Yes', True), ('on', True), ('oui', True),
+    ('0', False), ('false', False), ('NO', False), ('off', False), ('non', False),
+])
+def test_bool(raw, expected):
+    def main(flag: bool):
+        pass
+
+    assert bind(main, flag=raw) == {"flag": expected}
+
+
+def test_invalid_bool():
+    def main(flag: bool):
+        pass
+
+    with pytest.raises(BindingError) as err:
+        bind(main, flag='peut-être')
+    assert err.value.errors[0]['argument'] == 'flag'
+    assert err.value.errors[0]['error'] == 'invalid'
+    assert err.value.errors[0]['expected'] == 'bool'
+
+
+def test_numbers():
+    def main(count: int, ratio: float):
+        pass
+
+    assert bind(main, count='3', ratio='0.5') == {"count": 3, "ratio": 0.5}
+
+
+def test_missing_and_invalid():
+    def main(count: int, name: str):
+        pass
+
+    with pytest.raises(BindingError) as err:
+        bind(main, count='abc')
+    assert {error['argument']: error['error'] for error in err.value.errors} == {"count": "invalid", "name": "missing"}
+    assert err.value.message.startswith("Arguments invalides")
+
+
+def test_missing_only_message():
+    def main(a: int, b: int):
+        pass
+
+    with pytest.raises(BindingError) as err:
+        bind(main)
+    assert err.value.message == "Arguments manquants: a, b"
+
+
+def test_default_not_required():
+    def main(limit: int = 10):
+        pass
+
+    assert bind(main) == {}
+
+
+def test_untyped_and_str_passed_through():
+    def main(a, b: str, c: typing.Any):
+        pass
+
+    assert bind(main, a='1', b='2', c='3') == {"a": "1", "b": "2", "c": "3"}
+
+
+def test_list_from_repeated_and_comma_values():
+    def main(ids: list[int]):
+        pass
+
+    binder = ArgumentBinder(main)
+    assert binder.bind(MultiDict([('ids', '1,2'), ('ids', ' 3 ')])) == {"ids": [1, 2, 3]}
+
+
+def test_list_from_json():
+    def main(ids: list[int], tags: set):
+        pass
+
+    assert bind(main, ids='[1, 2]', tags='["a", "b", "a"]') == {"ids": [1, 2], "tags": {"a", "b"}}
+
+
+def test_tuple_container():
+    def main(values: tuple[float, ...]):
+        pass
+
+    assert bind(main, values='1.5,2') == {"values": (1.5, 2.0)}
+
+
+def test_list_without_getlist():
+    def main(ids: list[int]):
+        pass
+
+    assert ArgumentBinder(main).bind({"ids": "4,5"}) == {"ids": [4, 5]}
+
+
+def test_dict_json():
+    def main(filters: dict):
+        pass
+
+    assert bind(main, filters='{"a": 1}') == {"filters": {"a": 1}}
+    with pytest.raises(BindingError):
+        bind(main, filters='[1]')
+
+
+def test_typeddict():
+    def main(point: Point, window: Window):
+        pass
+
+    assert bind(main, point='{"x": 1, "y": 2}', window='{}') == {"point": {"x": 1, "y": 2}, "window": {}}
+    with pytest.raises(BindingError) as err:
+        bind(main, point='{"x": 1}', window='{}')
+    assert "y" in err.value.errors[0]['detail']
+
+
+def test_dataclass():
+    def main(options: Options):
+        pass
+
+    assert bind(main, options='{"name": "a"}') == {"options": Options("a", 1)}
+    with pytest.raises(BindingError):
+        bind(main, options='{"unknown": 1}')
+
+
+def test_dates():
+    def main(day: datetime.date, at: datetime.datetime, hour: datetime.time):
+        pass
+
+    assert bind(main, day='2025-01-02', at='2025-01-02T03:04:05', hour='06:07') == {
+        "day": datetime.date(2025, 1, 2),
+        "at": datetime.datetime(2025, 1, 2, 3, 4, 5),
+        "hour": datetime.time(6, 7),
+    }
+
+
+@pytest.mark.parametrize('annotation', [typing.Optional[int], int | None])
+def test_optional(annotation):
+    def main(value: annotation = None):
+        pass
+
+    assert bind(main, value='7') == {"value": 7}
+
+
+def test_ambiguous_union_passed_through():
+    def main(value: int | str):
+        pass
+
+    assert bind(main, value='7') == {"value": "7"}
+
+
+def test_kwargs_receive_extra_parameters():
+    def main(a: int, **kwargs):
+        pass
+
+    assert bind(main, a='1', extra='x') == {"a": 1, "extra": "x"}
+
+
+def test_extra_parameters_ignored_without_kwargs():
+    def main(a: int):
+        pass
+
+    assert bind(main, a='1', extra='x') == {"a": 1}
+
+
+def test_describe():
+    def main(a: int, b: list[str], c=None):
+        pass
+
+    assert ArgumentBinder(main).describe() == [
+        {"name": "a", "type": "int", "required": True},
+        {"name": "b", "type": "list[str]", "required": True},
+        {"name": "c", "type": "Any", "required": False},
+    ]
@@ -0,0 +1,72 @@
+import threading
+
+from core.bulkhead import Bulkhead, BulkheadRegistry
+
+
+def test_acquire_up_to_limit():
+    bulkhead = Bulkhead('script')
+    assert bulkhead.acquire(2)
+    assert bulkhead.acquire(2)
+    assert not bulkhead.acquire(2)
+    assert bulkhead.stats() == {"active": 2, "peak": 2, "completed": 0, "rejected": 1, "timeouts": 0}
+
+
+def test_release_frees_a_slot():
+    bulkhead = Bulkhead('script')
+    assert bulkhead.acquire(1)
+    bulkhead.release()
+    assert bulkhead.acquire(1)
+    assert bulkhead.stats()['completed'] == 1
+    assert bulkhead.stats()['active'] == 1
+
+
+def test_no_limit():
+    bulkhead = Bulkhead('script')
+    for _ in range(100):
+        assert bulkhead.acquire(None)
+    assert bulkhead.stats()['peak'] == 100
+
+
+def test_limit_follows_changes():
+    bulkhead = Bulkhead('script')
+    assert bulkhead.acquire(3)
+    assert bulkhead.acquire(3)
+    # Limite abaissée dans l'administration: les exécutions en cours continuent, les suivantes sont refusées
+    assert not bulkhead.acquire(1)
+    bulkhead.release()
+    bulkhead.release()
+    assert bulkhead.acquire(1)
+
+
+def test_record_timeout():
+    bulkhead = Bulkhead('script')
+    bulkhead.record_timeout()
+    assert bulkhead.stats()['timeouts'] == 1
+
+
+def test_concurrent_acquire_never_exceeds_limit():
+    bulkhead = Bulkhead('script')
+    barrier = threading.Barrier(16)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(bulkhead.acquire(4))
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 4
+    assert bulkhead.stats()['rejected'] == 12
+
+
+def test_registry_returns_one_bulkhead_per_script():
+    registry = BulkheadRegistry()
+    assert registry.get('a') is registry.get('a')
+    assert registry.get('a') is not registry.get('b')
+    registry.get('a').acquire()
+    assert registry.stats()['a']['active'] == 1
+    assert registry.stats()['b']['active'] == 0
@@ -0,0 +1,135 @@
+from types import SimpleNamespace
+
+import pytest
+from core import ratelimit
+from core.ratelimit import RateLimiter, TokenBucket, resolve_rate_limits, SWEEP_INTERVAL
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, 'time', clock)
+    return clock
+
+
+def test_bucket_burst_then_refill(clock):
+    bucket = TokenBucket(3)
+    assert [bucket.take(1, 3)[0] for _ in range(4)] == [True, True, True, False]
+
+    clock.now += 1
+    assert bucket.take(1, 3) == (True, 0)
+
+
+def test_bucket_refill_capped_at_capacity(clock):
+    bucket = TokenBucket(2)
+    bucket.take(1, 2)
+    clock.now += 100
+    assert bucket.take(1, 2) == (True, 1)
+
+
+def test_bucket_refund(clock):
+    bucket = TokenBucket(1)
+    bucket.take(1, 1)
+    bucket.refund(1)
+    bucket.refund(1)
+    assert bucket.tokens == 1
+
+
+def test_bucket_full_at(clock):
+    bucket = TokenBucket(4)
+    assert bucket.full_at == clock.now
+    bucket.take(2, 4)
+    assert bucket.full_at == clock.now + 0.5
+
+
+def test_check_without_limits():
+    assert RateLimiter().check('script', []) is None
+
+
+def test_check_allows_then_rejects(clock):
+    limiter = RateLimiter()
+    limits = [(('script', 's'), 60, 2)]
+
+    first = limiter.check('s', limits)
+    assert first.allowed and first.limit == 2 and first.remaining == 1
+
+    limiter.check('s', limits)
+    rejected = limiter.check('s', limits)
+    assert not rejected.allowed
+    assert rejected.remaining == 0
+    assert rejected.retry_after == 1
+    assert limiter.stats() == {"s": 1}
+
+
+def test_rejected_call_refunds_other_buckets(clock):
+    limiter = RateLimiter()
+    # Le seau du token a de la place, celui du script est vide: le jeton pris au token est rendu
+    limiter.check('s', [(('script', 's'), 60, 1)])
+    limits = [(('token', 1), 60, 5), (('script', 's'), 60, 1)]
+    assert not limiter.check('s', limits).allowed
+    assert limiter._buckets[('token', 1)].tokens == 5
+
+
+def test_most_restrictive_limit_reported(clock):
+    limiter = RateLimiter()
+    result = limiter.check('s', [(('token', 1), 60, 10), (('script', 's'), 60, 3)])
+    assert result.limit == 3
+    assert result.remaining == 2
+
+
+def test_apply_headers():
+    response = SimpleNamespace(headers={})
+    ratelimit.RateLimitResult(False, 10, 0, 6, 1).apply(response)
+    assert response.headers == {"X-RateLimit-Limit": "10", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "6", "Retry-After": "1"}
+
+
+def test_sweep_drops_refilled_buckets(clock):
+    limiter = RateLimiter()
+    for token_id in range(100):
+        limiter.check('s', [(('token', token_id), 60, 5)])
+    assert len(limiter._buckets) == 100
+
+    clock.now += SWEEP_INTERVAL
+    limiter.check('s', [(('token', 'new'), 60, 5)])
+    assert list(limiter._buckets) == [('token', 'new')]
+
+
+def test_sweep_keeps_buckets_still_refilling(clock):
+    limiter = RateLimiter()
+    # 1 requête par minute: le seau vidé met 5 minutes à se remplir
+    for _ in range(5):
+        limiter.check('s', [(('script', 's'), 1, 5)])
+
+    clock.now += SWEEP_INTERVAL
+    limiter.check('s', [(('token', 'other'), 60, 5)])
+    assert ('script', 's') in limiter._buckets
+    assert limiter.check('s', [(('script', 's'), 1, 5)]).allowed
+    assert not limiter.check('s', [(('script', 's'), 1, 5)]).allowed
+
+
+def test_sweep_at_most_once_per_interval(clock):
+    limiter = RateLimiter()
+    limiter.check('s', [(('token', 1), 60, 5)])
+    clock.now += SWEEP_INTERVAL / 2
+    limiter.check('s', [(('token', 2), 60, 5)])
+    assert len(limiter._buckets) == 2
+
+
+def test_resolve_rate_limits():
+    script_db = SimpleNamespace(id='s', rate_limit=60, rate_burst=10, token_rate_limit=30)
+    token = SimpleNamespace(id=7, rate_limit=120, rate_burst=None)
+    assert resolve_rate_limits(script_db, token) == [
+        (('script', 's'), 60, 10),
+        (('token', 7), 120, None),
+        (('token_script', 7, 's'), 30, None),
+    ]
+    assert resolve_rate_limits(script_db) == [(('script', 's'), 60, 10)]
+    assert resolve_rate_limits(SimpleNamespace(id='s', rate_limit=None, rate_burst=None, token_rate_limit=None), token) == [(('token', 7), 120, None)]
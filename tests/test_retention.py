@@ -0,0 +1,116 @@
+import os
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from core.retention import LogRetention, RetentionPolicy
+from models.database import db, LogSocket, LogApi, LogSystem
+
+
+def add_socket_logs(count, age_days=0):
+    timestamp = datetime.utcnow() - timedelta(days=age_days)
+    db.session.add_all([LogSocket(timestamp=timestamp, method='GET', path=f'/p/{i}', status_code=200) for i in range(count)])
+    db.session.commit()
+
+
+def pragma(name):
+    with db.engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+@pytest.fixture
+def retention(app):
+    retention = LogRetention()
+    retention.app = app
+    retention.batch_size = 4
+    retention.pause = 0
+    yield retention
+    retention.stop()
+
+
+def test_prune_by_age(retention):
+    add_socket_logs(10, age_days=30)
+    add_socket_logs(3)
+    retention.policies = {'log_socket': RetentionPolicy(max_age_days=14)}
+
+    assert retention.run() == {'log_socket': 10}
+    assert LogSocket.query.count() == 3
+    assert retention.last_deleted == {'log_socket': 10}
+    assert retention.last_run is not None
+
+
+def test_prune_by_rows_keeps_newest(retention):
+    add_socket_logs(25)
+    retention.policies = {'log_socket': RetentionPolicy(max_rows=10)}
+
+    assert retention.run() == {'log_socket': 15}
+    assert [row.path for row in LogSocket.query.order_by(LogSocket.id)] == [f'/p/{i}' for i in range(15, 25)]
+
+
+def test_age_and_rows_combined(retention):
+    add_socket_logs(5, age_days=30)
+    add_socket_logs(8)
+    retention.policies = {'log_socket': RetentionPolicy(max_age_days=14, max_rows=6)}
+
+    assert retention.run() == {'log_socket': 7}
+    assert LogSocket.query.count() == 6
+
+
+def test_tables_without_policy_untouched(retention):
+    add_socket_logs(5, age_days=30)
+    db.session.add(LogApi(timestamp=datetime.utcnow() - timedelta(days=365), name='old'))
+    db.session.commit()
+    retention.policies = {'log_socket': RetentionPolicy(), 'log_api': None}
+
+    assert retention.run() == {}
+    assert LogSocket.query.count() == 5
+    assert LogApi.query.count() == 1
+
+
+def test_archive(retention, tmp_path):
+    add_socket_logs(6, age_days=30)
+    archive_dir = tmp_path / 'archive'
+    archive_dir.mkdir()
+    retention.archive_dir = str(archive_dir)
+    retention.policies = {'log_socket': RetentionPolicy(max_age_days=1)}
+    retention.run()
+
+    files = os.listdir(archive_dir)
+    assert len(files) == 1 and files[0].startswith('log_socket-') and files[0].endswith('.jsonl.gz')
+    with gzip.open(archive_dir / files[0]) as archive:
+        rows = [json.loads(line) for line in archive]
+    assert [row['path'] for row in rows] == [f'/p/{i}' for i in range(6)]
+
+
+def test_disabled_by_default(app):
+    retention = LogRetention()
+    retention.configure(app)
+    assert retention._thread is None
+    assert pragma('auto_vacuum') == 0
+
+
+def test_no_implicit_vacuum(app):
+    retention = LogRetention()
+    retention.configure(app, enable=True, interval=3600)
+    try:
+        assert pragma('auto_vacuum') == 0
+        assert LogSystem.query.filter(LogSystem.message.like('VACUUM incrémental inactif%')).count() == 1
+    finally:
+        retention.stop()
+
+
+def test_vacuum_convert_and_incremental_vacuum(app):
+    retention = LogRetention()
+    retention.configure(app, enable=True, interval=3600, batch_size=500, pause=0, vacuum_pages=0, vacuum_convert=True)
+    try:
+        assert pragma('auto_vacuum') == 2
+
+        db.session.add_all([LogSocket(timestamp=datetime.utcnow() - timedelta(days=30), path='x' * 2000) for _ in range(200)])
+        db.session.commit()
+        retention.policies = {'log_socket': RetentionPolicy(max_age_days=1)}
+        assert retention.run() == {'log_socket': 200}
+        assert pragma('freelist_count') == 0
+    finally:
+        retention.stop()
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+from core.serializer import JsonSerializer, orjson
+
+
+BACKENDS = ['json'] + (['orjson'] if orjson is not None else [])
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_large_int(backend):
+    serializer = JsonSerializer()
+    serializer.configure(backend)
+    assert json.loads(serializer.dumps({"value": 2 ** 70})) == {"value": 2 ** 70}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_non_str_keys(backend):
+    serializer = JsonSerializer()
+    serializer.configure(backend)
+    assert json.loads(serializer.dumps({1: "a", 2.5: "b", None: "c"})) == {"1": "a", "2.5": "b", "null": "c"}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_sorted_keys_with_large_int(backend):
+    serializer = JsonSerializer()
+    serializer.configure(backend, sort_keys=True)
+    assert serializer.dumps({"b": 2 ** 70, "a": 1}) == b'{"a":1,"b":1180591620717411303424}'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_keys_sorted_by_default(backend):
+    serializer = JsonSerializer()
+    serializer.configure(backend)
+    assert serializer.dumps({"b": 1, "a": {"d": 2, "c": 3}}) == b'{"a":{"c":3,"d":2},"b":1}'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_unsorted_keys(backend):
+    serializer = JsonSerializer()
+    serializer.configure(backend, sort_keys=False)
+    assert serializer.dumps({"b": 1, "a": 2}) == b'{"b":1,"a":2}'
+
+
+def test_mixed_keys_sorted_falls_back_to_dict_order():
+    serializer = JsonSerializer()
+    serializer.configure('json')
+    assert json.loads(serializer.dumps({"b": 1, 2: "x"})) == {"b": 1, "2": "x"}
@@ -0,0 +1,124 @@
+import time
+import threading
+
+import pytest
+from core.session_store import SessionStore, MemorySessionStore, SqliteSessionStore, SessionManager
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemorySessionStore()
+    return SqliteSessionStore(str(tmp_path / 'sessions.db'))
+
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+    class Incomplete(SessionStore):
+        def put(self, token, user_id, role, expires_at):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_put_get(store):
+    store.put('token', 1, 'admin', time.time() + 60)
+    assert store.get('token') == {"user_id": 1, "role": "admin"}
+    assert store.get('unknown') is None
+    assert len(store) == 1
+
+
+def test_put_replaces(store):
+    store.put('token', 1, 'admin', time.time() + 60)
+    store.put('token', 2, 'user', time.time() + 60)
+    assert store.get('token') == {"user_id": 2, "role": "user"}
+    assert len(store) == 1
+
+
+def test_expired_session(store):
+    store.put('token', 1, 'admin', time.time() - 1)
+    assert store.get('token') is None
+
+
+def test_revoke(store):
+    store.put('token', 1, 'admin', time.time() + 60)
+    store.revoke('token')
+    store.revoke('unknown')
+    assert store.get('token') is None
+
+
+def test_sweep(store):
+    store.put('expired-1', 1, 'admin', time.time() - 1)
+    store.put('expired-2', 1, 'admin', time.time() - 1)
+    store.put('valid', 1, 'admin', time.time() + 60)
+    assert store.sweep() == 2
+    assert len(store) == 1
+    assert store.get('valid') is not None
+
+
+def test_memory_store_bounded():
+    store = MemorySessionStore(max_entries=2)
+    for token in ('a', 'b'):
+        store.put(token, 1, 'admin', time.time() + 60)
+    # 'a' utilisé récemment: 'b' est le moins récemment utilisé
+    store.get('a')
+    store.put('c', 1, 'admin', time.time() + 60)
+    assert store.get('b') is None
+    assert store.get('a') is not None
+    assert store.get('c') is not None
+
+
+def test_sqlite_store_keeps_only_digest(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    store = SqliteSessionStore(path)
+    store.put('secret-token', 1, 'admin', time.time() + 60)
+    digest = store._connect().execute("SELECT digest FROM iris_session").fetchone()[0]
+    assert digest != 'secret-token'
+    assert len(digest) == 64
+
+
+def test_sqlite_store_shared_between_instances_and_threads(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    SqliteSessionStore(path).put('token', 1, 'admin', time.time() + 60)
+    other = SqliteSessionStore(path)
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(other.get('token')))
+    thread.start()
+    thread.join()
+    assert results == [{"user_id": 1, "role": "admin"}]
+
+
+def test_manager_create_and_revoke():
+    manager = SessionManager()
+    manager.configure('memory', ttl=60, sweep_interval=3600)
+    try:
+        expires_at = manager.create('token', 1, 'admin')
+        assert expires_at == pytest.approx(time.time() + 60, abs=5)
+        assert manager.get('token') == {"user_id": 1, "role": "admin"}
+        manager.revoke('token')
+        assert manager.get('token') is None
+        assert manager.stats() == {"backend": "memory", "sessions": 0}
+    finally:
+        manager.stop()
+
+
+def test_manager_unknown_backend():
+    with pytest.raises(ValueError):
+        SessionManager().configure('redis')
+
+
+def test_manager_sweeper(tmp_path):
+    manager = SessionManager()
+    manager.configure('sqlite', path=str(tmp_path / 'sessions.db'), sweep_interval=0.05)
+    try:
+        manager.store.put('expired', 1, 'admin', time.time() - 1)
+        deadline = time.time() + 5
+        while len(manager.store) and time.time() < deadline:
+            time.sleep(0.05)
+        assert len(manager.store) == 0
+    finally:
+        manager.stop()
@@ -0,0 +1,143 @@
+import pytest
+from core import token_cache as token_cache_module
+from core.token_cache import TokenCache
+from models.database import db, User, ApiScript, ApiToken
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(token_cache_module, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def token(app):
+    user = User(username='admin', password_hash='x', role='admin')
+    db.session.add(user)
+    db.session.commit()
+
+    script = ApiScript(id='hello', path='hello.py')
+    token = ApiToken(token='secret', name='t', token_type='app', creator_id=user.id, environment_vars={"A": "1"}, rate_limit=60)
+    token.accessible_scripts.append(script)
+    db.session.add_all([script, token])
+    db.session.commit()
+    return token
+
+
+def test_load_detached_copy(token, clock):
+    cache = TokenCache()
+    cached = cache.get('secret')
+    assert cached.id == token.id
+    assert cached.is_active
+    assert cached.token_type == 'app'
+    assert cached.environment_vars == {"A": "1"}
+    assert cached.rate_limit == 60
+    assert cached.script_ids == frozenset({'hello'})
+
+
+def test_hit_until_ttl(token, clock):
+    cache = TokenCache(ttl=60)
+    first = cache.get('secret')
+    assert cache.get('secret') is first
+    assert cache.stats()['hits'] == 1
+
+    clock.now += 61
+    assert cache.get('secret') is not first
+    assert cache.stats()['misses'] == 2
+
+
+def test_invalidate_reloads(token, clock):
+    cache = TokenCache()
+    assert cache.get('secret').is_active
+
+    token.is_active = False
+    db.session.commit()
+    assert cache.get('secret').is_active
+    cache.invalidate('secret')
+    assert not cache.get('secret').is_active
+
+
+def test_lru_eviction(token, clock):
+    user_id = token.creator_id
+    db.session.add_all([ApiToken(token=f'other-{i}', name='t', creator_id=user_id) for i in range(3)])
+    db.session.commit()
+
+    cache = TokenCache(max_entries=2)
+    cache.get('secret')
+    cache.get('other-0')
+    cache.get('secret')
+    cache.get('other-1')
+    assert set(cache._entries) == {'secret', 'other-1'}
+
+
+def test_unknown_tokens_cached_separately(token, clock):
+    cache = TokenCache(max_entries=1, negative_ttl=5, max_negative=3)
+    cache.get('secret')
+    for i in range(10):
+        assert cache.get(f'unknown-{i}') is None
+
+    # Un balayage de tokens inconnus n'évince pas les tokens valides
+    assert 'secret' in cache._entries
+    assert len(cache._unknown) == 3
+    assert cache.stats()['unknown'] == 3
+
+
+def test_unknown_token_expires(token, clock):
+    cache = TokenCache(negative_ttl=5)
+    assert cache.get('later') is None
+    db.session.add(ApiToken(token='later', name='t', creator_id=token.creator_id))
+    db.session.commit()
+
+    assert cache.get('later') is None
+    clock.now += 6
+    assert cache.get('later') is not None
+
+
+def test_invalidate_clears_unknown(token, clock):
+    cache = TokenCache()
+    assert cache.get('later') is None
+    db.session.add(ApiToken(token='later', name='t', creator_id=token.creator_id))
+    db.session.commit()
+
+    cache.invalidate('later')
+    assert cache.get('later') is not None
+
+
+@pytest.mark.parametrize('invalidated', ['secret', None])
+def test_load_racing_invalidation_not_cached(token, clock, monkeypatch, invalidated):
+    cache = TokenCache()
+    load = cache._load
+
+    def racing_load(token_str):
+        # Lecture de l'état avant la modification, puis invalidation par une route d'administration
+        cached = load(token_str)
+        token.is_active = False
+        db.session.commit()
+        cache.invalidate(invalidated)
+        return cached
+
+    monkeypatch.setattr(cache, '_load', racing_load)
+    assert cache.get('secret').is_active
+    monkeypatch.setattr(cache, '_load', load)
+
+    assert 'secret' not in cache._entries
+    assert not cache.get('secret').is_active
+
+
+def test_configure_resets(token, clock):
+    cache = TokenCache()
+    cache.get('secret')
+    cache.get('unknown')
+    cache.configure(ttl=10, max_entries=5, negative_ttl=1, max_negative=2)
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['unknown'] == 0
+    assert (cache.ttl, cache.max_entries, cache.negative_ttl, cache.max_negative) == (10, 5, 1, 2)